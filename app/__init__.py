@@ -1,21 +1,30 @@
+import time
+# Cold start is measured from here: the extension imports below count too
+IMPORT_STARTED = time.perf_counter()
+
 import os
-from flask import Flask
+import click
+from flask import Flask, jsonify
 from dotenv import load_dotenv
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
 from flask_mail import Mail, Message
 from flask_jwt_extended import JWTManager
+from .utils.replicas import RoutingSession, replica_binds
 
 
 bcrypt = Bcrypt()
-db = SQLAlchemy()
+# Reads of GET requests may go to a replica, see app.utils.replicas
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 mail = Mail()
 jwt = JWTManager()
 
 load_dotenv()
 
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
 def create_app():
+    started = time.perf_counter()
     app = Flask(__name__, template_folder='templates')
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
@@ -23,6 +32,67 @@ def create_app():
     #sqlalchemy config
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool sizing, pre-ping, recycle and timeouts come from DB_* env vars
+    from .utils.db_pool import engine_options_from_env
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env(app.config['SQLALCHEMY_DATABASE_URI'])
+    
+    #read replica config (comma separated URIs; none keeps every query on DATABASE_URI)
+    app.config['SQLALCHEMY_BINDS'] = replica_binds(os.getenv('DATABASE_REPLICA_URIS', ''))
+    # A replica further behind than this gets no reads until it catches up
+    app.config['REPLICA_MAX_LAG_SECONDS'] = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+    app.config['REPLICA_LAG_CHECK_SECONDS'] = float(os.getenv('REPLICA_LAG_CHECK_SECONDS', 2))
+    # How long a client that wrote something keeps reading from the primary
+    app.config['READ_YOUR_WRITES_SECONDS'] = float(os.getenv('READ_YOUR_WRITES_SECONDS', 10))
+    
+    #bcrypt config
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # Processes that run bcrypt off the request threads (0 hashes inline). Every
+    # server worker has its own pool, so under a server (WEB_CONCURRENCY set,
+    # as gunicorn.conf.py does) the default splits the cores between them
+    cpus = os.cpu_count() or 1
+    workers = int(os.getenv('WEB_CONCURRENCY', 1))
+    app.config['BCRYPT_POOL_SIZE'] = int(os.getenv('BCRYPT_POOL_SIZE', max(cpus // workers, 1)))
+    # Processes for batch hashing (flask user import), a pool of its own
+    app.config['BCRYPT_BATCH_POOL_SIZE'] = int(os.getenv('BCRYPT_BATCH_POOL_SIZE', cpus))
+    # Hashes a worker allows in flight before new ones are shed with a 429
+    # (default: twice the pool size)
+    app.config['BCRYPT_MAX_PENDING'] = int(os.getenv('BCRYPT_MAX_PENDING', 0)) or None
+    app.config['BCRYPT_RETRY_AFTER'] = int(os.getenv('BCRYPT_RETRY_AFTER', 1))
+    
+    #entity cache config ('memory', 'null' or 'package.module:BackendClass'). 'memory' is
+    # per worker; commits reach the other workers' copies through Postgres NOTIFY
+    app.config['ENTITY_CACHE_BACKEND'] = os.getenv('ENTITY_CACHE_BACKEND', 'memory')
+    app.config['ENTITY_CACHE_MAX_ENTRIES'] = int(os.getenv('ENTITY_CACHE_MAX_ENTRIES', 10000))
+    app.config['ENTITY_CACHE_TTL'] = int(os.getenv('ENTITY_CACHE_TTL', 60))
+    
+    #request metrics config (0 disables the slow-request log; empty token leaves /metrics open)
+    app.config['SLOW_REQUEST_MS'] = int(os.getenv('SLOW_REQUEST_MS', 0))
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    # 'log' warns when a view exceeds its @query_budget, 'raise' fails the request, 'off' skips it
+    app.config['QUERY_BUDGET_MODE'] = os.getenv('QUERY_BUDGET_MODE', 'log')
+    # Benchmarks only: adds a pg_sleep of this many ms to every request
+    app.config['DB_SIMULATED_LATENCY_MS'] = int(os.getenv('DB_SIMULATED_LATENCY_MS', 0))
+    
+    #evidence store config
+    app.config['EVIDENCE_STORE_PATH'] = os.getenv('EVIDENCE_STORE_PATH', os.path.join(app.instance_path, 'evidence'))
+    app.config['EVIDENCE_MAX_SIZE'] = int(os.getenv('EVIDENCE_MAX_SIZE', 50 * 1024 * 1024))
+    # Chunk size suggested to clients; any size up to the whole file is accepted
+    app.config['EVIDENCE_CHUNK_SIZE'] = int(os.getenv('EVIDENCE_CHUNK_SIZE', 5 * 1024 * 1024))
+    # `flask evidence prune` cancels uploads that got no chunk for this long
+    app.config['EVIDENCE_UPLOAD_EXPIRY_HOURS'] = int(os.getenv('EVIDENCE_UPLOAD_EXPIRY_HOURS', 24))
+    
+    #agent work queue config (how long a claimed report stays with its agent without a renewal)
+    app.config['REPORT_CLAIM_LEASE_SECONDS'] = int(os.getenv('REPORT_CLAIM_LEASE_SECONDS', 15 * 60))
+    
+    #token revocation config (how stale another worker's revocations may be here)
+    app.config['TOKEN_REVOCATION_SYNC_SECONDS'] = float(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', 2))
+    
+    #report event stream config
+    # Events one stream may have queued before it is cut off (it reconnects and replays)
+    app.config['REPORT_STREAM_MAX_PENDING'] = int(os.getenv('REPORT_STREAM_MAX_PENDING', 500))
+    app.config['REPORT_STREAM_REPLAY_LIMIT'] = int(os.getenv('REPORT_STREAM_REPLAY_LIMIT', 1000))
+    app.config['REPORT_STREAM_HEARTBEAT_SECONDS'] = int(os.getenv('REPORT_STREAM_HEARTBEAT_SECONDS', 15))
+    app.config['REPORT_EVENTS_RETENTION_HOURS'] = int(os.getenv('REPORT_EVENTS_RETENTION_HOURS', 24))
     
     #mailtrap config
     app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER')
@@ -35,19 +105,67 @@ def create_app():
     app.config['MAIL_SUPPRESS_SEND'] = False
     app.config['MAIL_DEBUG'] = True
     
+    #outbox mail worker config
+    app.config['MAIL_OUTBOX_BATCH_SIZE'] = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', 50))
+    app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', 8))
+    # A batch not finished within this is retried by another worker
+    app.config['MAIL_OUTBOX_CLAIM_SECONDS'] = int(os.getenv('MAIL_OUTBOX_CLAIM_SECONDS', 300))
+    # In production, this would point to your React Frontend URL
+    app.config['ACTIVATION_URL_BASE'] = os.getenv('ACTIVATION_URL_BASE', 'http://localhost:5555/auth/activate')
+    
+    from .utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
     db.init_app(app)
+    from .utils.db_pool import init_pool_metrics
+    init_pool_metrics(app, db)
+    from .utils.replicas import init_replica_routing
+    init_replica_routing(app, db)
+    from .utils.cache import init_cache
+    init_cache(app)
+    from .utils.evidence_store import init_evidence_store
+    init_evidence_store(app)
+    from .utils.metrics import init_metrics
+    init_metrics(app, db)
+    from .utils.async_db import init_simulated_latency
+    init_simulated_latency(app, db)
     bcrypt.init_app(app)
     mail.init_app(app)
     jwt.init_app(app)
+    from .utils.revocation import init_revocation
+    init_revocation(app, jwt)
     
     from .models.user import User
     from .models.report import Report
+    from .models.report_stat import ReportStat
+    from .models.outbox import OutboxEmail
+    from .models.evidence import EvidenceUpload
+    from .models.report_event import ReportEvent
+    from .models.token_revocation import TokenRevocation
+    # Registers the session listeners that log report events
+    from .utils import report_events
     from .blueprints.auth.routes import auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
     from .blueprints.user.routes import user_bp
+    from .blueprints.user import commands as user_commands
     app.register_blueprint(user_bp, url_prefix='/users')
     from .blueprints.reports.routes import reports_bp
+    from .blueprints.reports import commands
     app.register_blueprint(reports_bp, url_prefix='/reports')
+    from .blueprints.evidence.routes import evidence_bp
+    from .blueprints.evidence import commands as evidence_commands
+    app.register_blueprint(evidence_bp, url_prefix='/reports')
+    from .blueprints.internal.routes import internal_bp
+    app.register_blueprint(internal_bp, url_prefix='/internal')
+    
+    from .utils.hashing import HashingOverloaded
+    
+    @app.errorhandler(HashingOverloaded)
+    def hashing_overloaded(e):
+        response = e.get_response()
+        response.data = jsonify({"error": e.description}).get_data()
+        response.content_type = 'application/json'
+        return response
     
     @app.route('/')
     def index():
@@ -57,7 +175,24 @@ def create_app():
             "version": "1.0.0"
         }
     
-    migrate = Migrate(app, db)
+    from .cli import register_cli
+    register_cli(app)
+    
+    # Only `flask db ...` needs Alembic; servers skip the import entirely
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        migrate = Migrate(app, db)
+    
+    # Mappers configured and engines made fork-safe, so gunicorn --preload
+    # does this once in the master instead of once per worker
+    from .utils.prefork import prepare_for_fork
+    prepare_for_fork(app, db)
+    
+    app.extensions['startup'] = {
+        'import_seconds': IMPORT_SECONDS,
+        'create_app_seconds': time.perf_counter() - started
+    }
+    app.logger.info('App created in %.3fs (imports %.3fs)', app.extensions['startup']['create_app_seconds'], IMPORT_SECONDS)
     
     return app
 
@@ -0,0 +1,250 @@
+"""ASGI entry point: the read-heavy GET endpoints run as native async views on
+an asyncpg engine, everything else is the regular Flask app in a thread pool.
+
+    uvicorn app.asgi:application --workers 4 --port 5555
+
+Needs the optional ``asyncpg`` and ``a2wsgi`` packages. The WSGI entry point
+(run.py, gunicorn.conf.py) is unaffected.
+
+Sync views run on a pool of ASGI_WSGI_THREADS threads. Long-lived streams
+(GET /reports/stream) hold their thread for as long as the client stays
+connected, so they get a pool of their own, ASGI_STREAM_THREADS, and can't
+starve the rest of the API.
+"""
+import asyncio
+import os
+import sys
+from io import BytesIO
+from a2wsgi import WSGIMiddleware
+from flask import current_app, g, request, jsonify, abort
+from flask_jwt_extended import verify_jwt_in_request
+from sqlalchemy import func, select
+from werkzeug.exceptions import HTTPException
+from app import create_app
+from app.models.report import Report
+from app.models.user import User
+from app.utils.async_db import init_async_db, async_session, simulate_db_latency
+from app.utils.cache import get_cache, cache_key, fill, pack_entity, unpack_entity
+from app.utils.revocation import get_revocation_list
+from app.utils.etag import make_etag, entity_etag, fieldset_etag, is_not_modified, with_etag, not_modified_response
+from app.utils.fields import parse_fields, only_fields
+from app.utils.pagination import clamp_page_size, keyset_query, page_from_rows
+
+REPORT_PAGE_KEY = (Report.created_at, Report.id)
+
+
+async def get_reports():
+    verify_jwt_in_request()
+    try:
+        fields = parse_fields(request.args.get('fields'), Report)
+        limit = clamp_page_size(request.args.get('limit', type=int))
+
+        async with async_session() as session:
+            await simulate_db_latency(session)
+            fingerprint = Report.filter_query(select(func.count(Report.id), func.max(Report.updated_at)), request.args)
+            count, last_updated = (await session.execute(fingerprint)).one()
+            etag = make_etag('reports', count, last_updated, sorted(request.args.items(multi=True)))
+            if is_not_modified(etag):
+                return not_modified_response(etag)
+
+            query = only_fields(select(Report), Report, fields, always=('created_at', 'id'))
+            query = keyset_query(Report.filter_query(query, request.args), REPORT_PAGE_KEY,
+                                 cursor=request.args.get('cursor'), limit=limit)
+            rows = (await session.execute(query)).scalars().all()
+            reports, next_cursor = page_from_rows(rows, REPORT_PAGE_KEY, limit)
+    except ValueError as e:
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
+
+    return with_etag(jsonify({
+        "reports": [report.to_dict(fields) for report in reports],
+        "next_cursor": next_cursor
+    }), etag)
+
+
+async def get_report_by_id(id):
+    verify_jwt_in_request()
+    try:
+        fields = parse_fields(request.args.get('fields'), Report)
+    except ValueError as e:
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
+
+    key = cache_key('report', id)
+    cached = get_cache().get(key)
+
+    if cached is None:
+        async with async_session() as session:
+            await simulate_db_latency(session)
+            report = await session.get(Report, id)
+        if report is None:
+            abort(404, description=f"Report ID {id} not found")
+        etag = entity_etag('report', id, report.updated_at)
+        body = current_app.json.dumps(report.to_dict()).encode('utf-8')
+        fill(key, pack_entity(etag, body))
+    else:
+        etag, body = unpack_entity(cached)
+
+    etag = fieldset_etag(etag, fields)
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    if fields:
+        payload = current_app.json.loads(body)
+        return with_etag(jsonify({field: payload[field] for field in fields}), etag)
+    return with_etag(current_app.response_class(body, mimetype='application/json'), etag)
+
+
+async def get_user(id):
+    verify_jwt_in_request()
+    key = cache_key('user', id)
+    cached = get_cache().get(key)
+
+    if cached is None:
+        async with async_session() as session:
+            await simulate_db_latency(session)
+            user = await session.get(User, id)
+        if user is None:
+            abort(404, description=f"User ID {id} not found")
+        safe_user = {"id": user.id, "name": user.name, "dob": user.dob, "barangay_complainant": user.barangay_complainant, "city": user.city, "role": user.role, "contact_num": user.contact_num}
+        etag = entity_etag('user', id, user.updated_at)
+        body = current_app.json.dumps(safe_user).encode('utf-8')
+        fill(key, pack_entity(etag, body))
+    else:
+        etag, body = unpack_entity(cached)
+
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    return with_etag(current_app.response_class(body, mimetype='application/json'), etag), 200
+
+
+# Flask endpoint -> async view serving it in ASGI mode. The Flask routes stay
+# registered: they match the URL and are the fallback under WSGI.
+ASYNC_VIEWS = {
+    'reports.get_reports': get_reports,
+    'reports.get_report_by_id': get_report_by_id,
+    'user.get_user': get_user,
+}
+
+# Sync endpoints that hold their thread for the life of the connection
+STREAM_ENDPOINTS = {'reports.stream_reports'}
+
+
+def _environ(scope):
+    # Minimal PEP 3333 environ for a body-less request, enough for Flask's
+    # request context (routing, args, headers)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': '',
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': (scope.get('server') or ('localhost', 80))[0],
+        'SERVER_PORT': str((scope.get('server') or ('localhost', 80))[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+
+class AsyncDispatcher:
+    def __init__(self, flask_app, wsgi_threads=10, stream_threads=50):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=wsgi_threads)
+        self.stream_wsgi = WSGIMiddleware(flask_app, workers=stream_threads)
+        self.engines = init_async_db(flask_app)
+
+    def _match(self, scope):
+        if scope['type'] != 'http' or scope['method'] not in ('GET', 'HEAD'):
+            return None, None
+        adapter = self.flask_app.url_map.bind('localhost')
+        try:
+            return adapter.match(scope['path'], method=scope['method'])
+        except HTTPException:
+            return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        endpoint, view_args = self._match(scope)
+        if endpoint in STREAM_ENDPOINTS:
+            return await self.stream_wsgi(scope, receive, send)
+        view = ASYNC_VIEWS.get(endpoint)
+        if view is None:
+            return await self.wsgi(scope, receive, send)
+
+        response = await self._dispatch(view, view_args, scope)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response.headers.items()]
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'' if scope['method'] == 'HEAD' else response.get_data()
+        })
+
+    async def _dispatch(self, view, view_args, scope):
+        # The same request lifecycle Flask runs for sync views: before/after
+        # request hooks (metrics, query accounting), error handlers, teardown
+        app = self.flask_app
+        ctx = app.request_context(_environ(scope))
+        ctx.push()
+        error = None
+        try:
+            try:
+                g.async_view = True
+                rv = app.preprocess_request()
+                if rv is None:
+                    rv = await view(**view_args)
+            except Exception as e:
+                rv = app.handle_user_exception(e)
+            return app.process_response(app.make_response(rv))
+        except Exception as e:
+            error = e
+            return app.handle_exception(e)
+        finally:
+            ctx.pop(error)
+
+    def _preload(self):
+        # Loads that would otherwise block the event loop inside the first
+        # async view: the token revocation list (verify_jwt_in_request) and
+        # the cache invalidation listener (get_cache)
+        with self.flask_app.app_context():
+            get_revocation_list().start()
+            get_cache()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, self._preload)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for engine in self.engines:
+                    await engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+application = AsyncDispatcher(
+    create_app(),
+    wsgi_threads=int(os.getenv('ASGI_WSGI_THREADS', 10)),
+    stream_threads=int(os.getenv('ASGI_STREAM_THREADS', 50))
+)
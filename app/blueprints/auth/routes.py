@@ -1,14 +1,19 @@
 from flask import Blueprint, request, jsonify, url_for
+from datetime import datetime
 from app.models.user import User
-from app import db, mail
-from flask_mail import Message
+from app.models.token_revocation import TokenRevocation
+from app import db
 from itsdangerous import URLSafeTimedSerializer
 import os
-from flask_jwt_extended import create_access_token
+from app.utils.auth import create_user_token
+from app.utils.hashing import HashingOverloaded
+from app.utils.query_budget import query_budget
+from flask_jwt_extended import jwt_required, get_jwt
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/login', methods=['POST'])
+@query_budget(3)
 def login():
     data = request.get_json()
     email = data.get('email')
@@ -20,7 +25,8 @@ def login():
         if not user.is_active:
             return jsonify({"error": "Account not activated. Please check your email."}), 403
         
-        access_token = create_access_token(identity=str(user.id))
+        # role/name/barangay ride along as claims so protected routes skip the user lookup
+        access_token = create_user_token(user)
         
         safe_user = {"id": user.id, "name": user.name, "dob": user.dob, "barangay_complainant": user.barangay_complainant, "city": user.city, "role": user.role, "contact_num": user.contact_num}
         
@@ -28,19 +34,35 @@ def login():
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except HashingOverloaded:
+        raise
     except Exception as e:
         return jsonify({
             "error": "An error occurred during login.",
             "details": str(e) 
         }), 500
 
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+@query_budget(1)
+def logout():
+    # Only this token: the user's other sessions stay signed in
+    claims = get_jwt()
+    expires_at = datetime.utcfromtimestamp(claims['exp']) if 'exp' in claims else None
+    TokenRevocation.revoke_token(claims['jti'], expires_at)
+    db.session.commit()
+    
+    return jsonify({"message": "Logged out."}), 200
+
 @auth_bp.route('/signup', methods=['POST'])
+@query_budget(3)
 def signup():
     data = request.get_json()
     
     try:
-        # 1. Create the user in the database (is_active=False)
-        user = User.create_inactive_user(
+        # Creates the user (is_active=False) and queues the activation email
+        # in the same transaction; the outbox worker delivers it
+        User.create_inactive_user(
             name=data.get('name'),
             dob=data.get('dob'),
             city=data.get('city'),
@@ -53,26 +75,12 @@ def signup():
             role=data.get('role', 'user')
         )
 
-        # 2. Generate Activation Token
-        token = user.generate_activation_token()
-        
-        # 3. Create Activation Link
-        # In production, this would point to your React Frontend URL
-        activation_link = f"http://localhost:5555/auth/activate/{token}"
-
-        # 4. Send Email via Mailtrap
-        msg = Message(
-            'Activate Your VAWC DeskHub Account',
-            sender='noreply@vawc-deskhub.com',
-            recipients=[user.email]
-        )
-        msg.body = f"Hello {user.name},\n\nPlease click the link below to activate your account:\n{activation_link}"
-        mail.send(msg)
-
         return jsonify({"message": "Registration successful. Please check your email to activate your account."}), 201
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except HashingOverloaded:
+        raise
     except Exception as e:
         # This will now tell you EXACTLY what failed (e.g., Mail configuration or Token error)
         return jsonify({
@@ -81,6 +89,7 @@ def signup():
         }), 500
 
 @auth_bp.route('/activate/<token>', methods=['GET'])
+@query_budget(2)
 def activate(token):
     serializer = URLSafeTimedSerializer(os.getenv('SECRET_KEY'))
     
@@ -0,0 +1,62 @@
+import json
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from app import db
+from app.blueprints.evidence.routes import evidence_bp
+from app.models.evidence import EvidenceUpload
+from app.models.report import Report
+from app.utils.evidence_store import get_evidence_store, inline_to_ref
+
+BATCH_SIZE = 500
+
+
+@evidence_bp.cli.command('prune')
+@click.option('--upload-hours', type=int, default=None,
+              help='Cancel uploads idle for this many hours. Defaults to EVIDENCE_UPLOAD_EXPIRY_HOURS.')
+def prune_evidence(upload_hours):
+    """Cancel abandoned uploads and delete files no report references:
+    part files without an upload, and blobs dropped from every report (or
+    left behind by a deleted one)."""
+    hours = upload_hours if upload_hours is not None else current_app.config['EVIDENCE_UPLOAD_EXPIRY_HOURS']
+    expired = EvidenceUpload.query.filter(EvidenceUpload.updated_at < datetime.utcnow() - timedelta(hours=hours)).delete(synchronize_session=False)
+    db.session.commit()
+
+    # Listed after the commit above: their part files are the ones to keep
+    uploads = {str(upload_id) for upload_id, in db.session.query(EvidenceUpload.id)}
+    referenced = set()
+    for evidences, in db.session.query(Report.evidences).yield_per(BATCH_SIZE):
+        referenced.update(e['sha256'] for e in evidences or () if isinstance(e, dict) and isinstance(e.get('sha256'), str))
+    db.session.close()
+
+    # Files written in the last hour may belong to a transaction that has
+    # not committed its upload or reference yet
+    parts, blobs = get_evidence_store().prune(uploads, referenced, min_age=3600)
+    click.echo(f'Cancelled {expired} abandoned upload(s); deleted {parts} part file(s) and {blobs} unreferenced blob(s).')
+
+
+@evidence_bp.cli.command('migrate-inline')
+def migrate_inline_evidence():
+    """Move evidence files stored inline in reports.evidences (from before
+    the upload API) into the evidence store, leaving references behind."""
+    store = get_evidence_store()
+    migrated = 0
+    last_id = 0
+    while True:
+        reports = (Report.query
+                   .filter(Report.id > last_id)
+                   .filter(db.func.octet_length(db.cast(Report.evidences, db.Text)) > Report.MAX_EVIDENCE_ENTRY_BYTES)
+                   .order_by(Report.id).limit(BATCH_SIZE).all())
+        if not reports:
+            break
+        for report in reports:
+            evidences = [
+                inline_to_ref(store, entry, position) if len(json.dumps(entry)) > Report.MAX_EVIDENCE_ENTRY_BYTES else entry
+                for position, entry in enumerate(report.evidences or [], start=1)
+            ]
+            if evidences != report.evidences:
+                report.evidences = evidences
+                migrated += 1
+        last_id = reports[-1].id
+        db.session.commit()
+    click.echo(f'Moved inline evidence of {migrated} report(s) to the evidence store.')
@@ -0,0 +1,154 @@
+import re
+from flask import Blueprint, request, jsonify, abort, current_app, send_file
+from werkzeug.http import parse_content_range_header
+from app.models.report import Report
+from app.models.evidence import EvidenceUpload
+from app import db
+from app.utils.auth import current_identity
+from app.utils.evidence_store import get_evidence_store
+from app.utils.query_budget import query_budget
+from flask_jwt_extended import jwt_required
+
+evidence_bp = Blueprint('evidence', __name__)
+
+def _report_for_caller(report_id, lock=False):
+    # Agents see every report's evidence, users only their own reports'
+    identity = current_identity()
+    query = Report.query.filter_by(id=report_id)
+    if lock:
+        query = query.with_for_update().populate_existing()
+    report = query.first()
+
+    if report is None:
+        abort(404, description=f"Report ID {report_id} not found")
+    if identity.role != 'agent' and report.reporter_id != identity.id:
+        abort(403, description="You can only access evidence of your own reports")
+    return report, identity
+
+def _upload_for(report_id, upload_id, lock=False):
+    query = EvidenceUpload.query.filter_by(id=upload_id, report_id=report_id)
+    if lock:
+        query = query.with_for_update()
+    upload = query.first()
+
+    if upload is None:
+        abort(404, description=f"Upload {upload_id} not found")
+    return upload
+
+@evidence_bp.route('/<int:report_id>/evidence/uploads', methods=['POST'])
+@jwt_required()
+@query_budget(3)
+def start_upload(report_id):
+    report, identity = _report_for_caller(report_id)
+    data = request.get_json(silent=True) or {}
+
+    filename = data.get('filename')
+    content_type = data.get('content_type') or 'application/octet-stream'
+    size = data.get('size')
+    max_size = current_app.config['EVIDENCE_MAX_SIZE']
+
+    if not filename or len(filename) > 255 or len(content_type) > 100:
+        return jsonify({"error": "Validation Error", "details": "A filename (and optional content_type) is required."}), 400
+    if not isinstance(size, int) or not 0 < size <= max_size:
+        return jsonify({"error": "Validation Error", "details": f"size must be between 1 and {max_size} bytes."}), 400
+    if len(report.evidences or []) >= Report.MAX_EVIDENCE_ENTRIES:
+        return jsonify({"error": "Validation Error", "details": f"A report can have at most {Report.MAX_EVIDENCE_ENTRIES} evidences."}), 400
+
+    upload = EvidenceUpload(report_id=report.id, uploader_id=identity.id, filename=filename, content_type=content_type, size=size)
+    db.session.add(upload)
+    db.session.commit()
+
+    return jsonify({**upload.to_dict(), "chunk_size": current_app.config['EVIDENCE_CHUNK_SIZE']}), 201
+
+@evidence_bp.route('/<int:report_id>/evidence/uploads/<uuid:upload_id>', methods=['GET'])
+@jwt_required()
+@query_budget(2)
+def upload_status(report_id, upload_id):
+    # Where to resume after a dropped connection
+    _report_for_caller(report_id)
+    return jsonify(_upload_for(report_id, upload_id).to_dict()), 200
+
+@evidence_bp.route('/<int:report_id>/evidence/uploads/<uuid:upload_id>', methods=['PUT'])
+@jwt_required()
+@query_budget(5)
+def upload_chunk(report_id, upload_id):
+    _report_for_caller(report_id)
+    # The row lock serialises chunks of one upload across workers
+    upload = _upload_for(report_id, upload_id, lock=True)
+
+    content_range = parse_content_range_header(request.headers.get('Content-Range'))
+    if content_range is None or content_range.units != 'bytes' or content_range.length != upload.size:
+        db.session.rollback()
+        return jsonify({"error": "Validation Error", "details": f"A 'Content-Range: bytes start-end/{upload.size}' header is required."}), 400
+    if content_range.start != upload.received:
+        db.session.rollback()
+        return jsonify({"message": "Chunk does not continue the upload. Resume from offset.", "offset": upload.received}), 409
+
+    length = content_range.stop - content_range.start
+    store = get_evidence_store()
+    if content_range.start > store.part_size(upload.id):
+        # The part file lost bytes the row counts (e.g. the disk was
+        # restored): appending at the offset would leave a hole of zeros
+        upload.received = store.part_size(upload.id)
+        db.session.commit()
+        return jsonify({"message": "Chunk does not continue the upload. Resume from offset.", "offset": upload.received}), 409
+    if store.append(upload.id, content_range.start, request.stream, length) != length:
+        db.session.rollback()
+        return jsonify({"message": "Chunk ended early. Resume from offset.", "offset": upload.received}), 400
+
+    if content_range.stop < upload.size:
+        upload.received = content_range.stop
+        db.session.commit()
+        return jsonify(upload.to_dict()), 200
+
+    sha256 = store.commit(upload.id)
+    ref = {"sha256": sha256, "filename": upload.filename, "content_type": upload.content_type, "size": upload.size}
+
+    # Re-read under lock so concurrent uploads to one report don't drop refs
+    report, _ = _report_for_caller(report_id, lock=True)
+    evidences = list(report.evidences or [])
+    if not any(isinstance(e, dict) and e.get('sha256') == sha256 for e in evidences):
+        evidences.append(ref)
+        report.evidences = evidences
+    db.session.delete(upload)
+    db.session.commit()
+    # Only now: had the commit failed, the client retries the last chunk
+    # against the part file
+    store.discard(upload.id)
+
+    return jsonify({"message": "Evidence uploaded", "evidence": ref}), 201
+
+@evidence_bp.route('/<int:report_id>/evidence/uploads/<uuid:upload_id>', methods=['DELETE'])
+@jwt_required()
+@query_budget(3)
+def cancel_upload(report_id, upload_id):
+    _report_for_caller(report_id)
+    upload = _upload_for(report_id, upload_id, lock=True)
+    get_evidence_store().discard(upload.id)
+    db.session.delete(upload)
+    db.session.commit()
+
+    return jsonify({"message": "Upload cancelled"}), 200
+
+@evidence_bp.route('/<int:report_id>/evidence/<sha256>', methods=['GET'])
+@jwt_required()
+@query_budget(1)
+def download_evidence(report_id, sha256):
+    if not re.fullmatch(r'[0-9a-f]{64}', sha256):
+        abort(404, description=f"Evidence {sha256} not found on report {report_id}")
+    report, _ = _report_for_caller(report_id)
+    ref = next((e for e in report.evidences or [] if isinstance(e, dict) and e.get('sha256') == sha256), None)
+
+    if ref is None:
+        abort(404, description=f"Evidence {sha256} not found on report {report_id}")
+
+    # conditional=True answers Range / If-Range with 206 partial content; the
+    # content hash is a natural strong ETag
+    return send_file(
+        get_evidence_store().blob_path(sha256),
+        mimetype=ref['content_type'],
+        download_name=ref['filename'],
+        conditional=True,
+        etag=sha256,
+        max_age=0
+    )
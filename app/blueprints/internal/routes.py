@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify, current_app
+from app.utils.auth import current_identity
+from app.utils.cache import get_cache
+from app.utils.db_pool import pool_stats
+from flask_jwt_extended import jwt_required
+
+internal_bp = Blueprint('internal', __name__)
+
+@internal_bp.before_request
+@jwt_required()
+def agents_only():
+    if current_identity().role != 'agent':
+        return jsonify({"message": "Only agents can view internal stats"}), 403
+
+@internal_bp.route('/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(get_cache().stats()), 200
+
+@internal_bp.route('/pool', methods=['GET'])
+def connection_pool_stats():
+    return jsonify(pool_stats(current_app)), 200
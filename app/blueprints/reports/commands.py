@@ -0,0 +1,79 @@
+import itertools
+import json
+import sys
+from datetime import timedelta
+import click
+from flask import current_app
+from app.blueprints.reports.routes import reports_bp
+from app.models.report import Report
+from app.models.report_stat import ReportStat
+from app.utils.export import EXPORT_FORMATS, stream_query, iter_export
+from app.utils.ingest import DEFAULT_CHUNK_SIZE, ingest_reports, iter_ndjson_lines, iter_json_array
+from app.utils.report_events import prune_report_events
+
+
+@reports_bp.cli.command('export')
+@click.option('--format', 'fmt', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson', show_default=True)
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='File to write to. Defaults to stdout.')
+@click.option('--status')
+@click.option('--incident-type')
+@click.option('--incident-brgy')
+@click.option('--city')
+@click.option('--reporter-type')
+@click.option('--created-from', help='ISO 8601 date or datetime (inclusive).')
+@click.option('--created-to', help='ISO 8601 date or datetime (inclusive).')
+def export_reports(fmt, output, **filters):
+    """Stream every report matching the filters as NDJSON or CSV."""
+    try:
+        query = Report.filter_query(Report.query, filters).order_by(Report.id)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    chunks = iter_export(stream_query(query), fmt, list(Report.FIELDS))
+
+    out = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if output:
+            out.close()
+
+
+@reports_bp.cli.command('rebuild-stats')
+def rebuild_stats():
+    """Recompute the report_stats summary table from the reports table."""
+    ReportStat.rebuild()
+    total = sum(ReportStat.summary(['status'])['status'].values())
+    click.echo(f'Rebuilt report stats for {total} report(s).')
+
+
+@reports_bp.cli.command('prune-events')
+@click.option('--hours', type=int, default=None, help='Keep this many hours of events. Defaults to REPORT_EVENTS_RETENTION_HOURS.')
+def prune_events(hours):
+    """Delete stream events too old to be replayed."""
+    hours = hours if hours is not None else current_app.config['REPORT_EVENTS_RETENTION_HOURS']
+    deleted = prune_report_events(timedelta(hours=hours))
+    click.echo(f'Deleted {deleted} report event(s) older than {hours} hour(s).')
+
+
+@reports_bp.cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True)
+def import_reports(source, chunk_size):
+    """Bulk insert reports from a JSON array or NDJSON file ('-' for stdin)."""
+    first = source.read(1)
+    while first and first.isspace():
+        first = source.read(1)
+
+    if first == '[':
+        records = iter_json_array(json.loads(first + source.read()))
+    else:
+        # Put the peeked character back in front of the first line
+        records = iter_ndjson_lines(itertools.chain([first + source.readline()], source))
+
+    result = ingest_reports(records, chunk_size=chunk_size)
+    for error in result['errors']:
+        click.echo(f"row {error['row']}: {error['error']}", err=True)
+    click.echo(f"Inserted {result['inserted']} report(s), {result['failed']} failed.")
@@ -1,38 +1,188 @@
-from flask import Blueprint, request, jsonify, url_for, abort
+from flask import Blueprint, request, jsonify, url_for, abort, current_app, Response, stream_with_context
 from app.models.report import Report
-from app.models.user import User
+from app.models.report_stat import ReportStat
 from app import db
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.pagination import keyset_paginate
+from app.utils.export import EXPORT_FORMATS, stream_query, iter_export
+from app.utils.fields import parse_fields, only_fields
+from app.utils.auth import current_identity
+from app.utils.ingest import ingest_reports, iter_ndjson_lines, iter_json_array
+from app.utils.cache import get_cache, cache_key, fill, pack_entity, unpack_entity
+from app.utils.etag import make_etag, entity_etag, fieldset_etag, is_not_modified, is_precondition_failed, with_etag, not_modified_response
+from app.utils.query_budget import query_budget
+from app.utils.transitions import bulk_transition, MAX_BULK_TRANSITION
+from app.utils.work_queue import claim_reports, renew_claim, release_claim, MAX_CLAIM
+from app.utils.report_events import iter_report_events
+from app.utils.replicas import read_from_primary
+from flask_jwt_extended import jwt_required
 
 reports_bp = Blueprint('reports', __name__)
 
 @reports_bp.route('/', methods=['GET'])
 @jwt_required()
+@query_budget(2)
 def get_reports():
-    reports = Report.query.all()
+    try:
+        fields = parse_fields(request.args.get('fields'), Report)
+        
+        # Cheap fingerprint of the filtered set: any insert, update or delete
+        # in it moves the count or the latest updated_at
+        count, last_updated = Report.filter_query(
+            db.session.query(db.func.count(Report.id), db.func.max(Report.updated_at)), request.args
+        ).one()
+        etag = make_etag('reports', count, last_updated, sorted(request.args.items(multi=True)))
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+        
+        query = only_fields(Report.query, Report, fields, always=('created_at', 'id'))
+        query = Report.filter_query(query, request.args)
+        reports, next_cursor = keyset_paginate(
+            query,
+            (Report.created_at, Report.id),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int)
+        )
+    except ValueError as e:
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
+    
+    return with_etag(jsonify({
+        "reports": [report.to_dict(fields) for report in reports],
+        "next_cursor": next_cursor
+    }), etag)
+
+@reports_bp.route('/search', methods=['GET'])
+@jwt_required()
+@query_budget(1)
+def search_reports():
+    try:
+        fields = parse_fields(request.args.get('fields'), Report)
+        query, rank = Report.search_query(db.session.query(Report), request.args.get('q'))
+        query = only_fields(query, Report, fields, always=('id',))
+        query = Report.filter_query(query, request.args).add_columns(rank.label('rank'))
+        rows, next_cursor = keyset_paginate(
+            query,
+            (rank, Report.id),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int),
+            row_values=lambda row: [row.rank, row.Report.id]
+        )
+    except ValueError as e:
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
+    
+    return jsonify({
+        "reports": [dict(row.Report.to_dict(fields), rank=row.rank) for row in rows],
+        "next_cursor": next_cursor
+    })
+
+@reports_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_reports():
+    fmt = request.args.get('format', 'ndjson')
+    
+    try:
+        fields = parse_fields(request.args.get('fields'), Report)
+        query = only_fields(Report.query, Report, fields, always=('id',))
+        query = Report.filter_query(query, request.args).order_by(Report.id)
+        body = iter_export(stream_query(query), fmt, list(Report.FIELDS), fields)
+    except ValueError as e:
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=reports.{fmt}"}
+    )
+
+# Each open stream keeps a worker thread busy for as long as the client
+# stays connected. gunicorn.conf.py runs threaded (gthread) workers, so size
+# WEB_CONCURRENCY * GUNICORN_THREADS for the dashboards expected to be open
+# plus regular traffic; a sync worker would be lost to a single stream. The
+# ASGI entry point (app.asgi) serves streams from their own thread pool,
+# ASGI_STREAM_THREADS.
+@reports_bp.route('/stream', methods=['GET'])
+@jwt_required()
+# The replay must reach at least as far as the live feed (the primary's NOTIFYs)
+@read_from_primary
+def stream_reports():
+    if current_identity().role != 'agent':
+        return jsonify({"message": "Only agents can follow the report stream"}), 403
+    
+    # EventSource resends the last id it saw when it reconnects
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return jsonify({"error": "Validation Error", "details": "Last-Event-ID must be an event id."}), 400
+    
+    return Response(
+        stream_with_context(iter_report_events(last_event_id)),
+        mimetype='text/event-stream',
+        # X-Accel-Buffering stops nginx from holding events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@reports_bp.route('/stats', methods=['GET'])
+@jwt_required()
+@query_budget(1)
+def get_report_stats():
+    dimensions = request.args.get('dimensions')
+    allowed = ReportStat.DIMENSIONS + ['month']
     
-    return jsonify([report.to_dict() for report in reports])
+    if dimensions:
+        dimensions = [d.strip() for d in dimensions.split(',') if d.strip()]
+        unknown = [d for d in dimensions if d not in allowed]
+        if unknown:
+            return jsonify({"error": "Validation Error", "details": f"Unknown dimension(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}."}), 400
+    
+    return jsonify(ReportStat.summary(dimensions))
 
 @reports_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
+@query_budget(1)
 def get_report_by_id(id):
-    report = Report.query.get(id)
+    try:
+        fields = parse_fields(request.args.get('fields'), Report)
+    except ValueError as e:
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
     
-    if report is None:
-        abort(404, description=f"User ID {id} not found")
+    # Read-through cache of the full payload's ETag and JSON; writes drop the
+    # entry on commit. Only primary reads fill it (see fill())
+    key = cache_key('report', id)
+    cached = get_cache().get(key)
+    
+    if cached is None:
+        report = Report.query.filter_by(id=id).first()
+        
+        if report is None:
+            abort(404, description=f"User ID {id} not found")
+        
+        etag = entity_etag('report', id, report.updated_at)
+        body = current_app.json.dumps(report.to_dict()).encode('utf-8')
+        fill(key, pack_entity(etag, body))
+    else:
+        etag, body = unpack_entity(cached)
+    
+    etag = fieldset_etag(etag, fields)
+    if is_not_modified(etag):
+        return not_modified_response(etag)
     
-    return jsonify(report.to_dict())
+    if fields:
+        payload = current_app.json.loads(body)
+        return with_etag(jsonify({field: payload[field] for field in fields}), etag)
+    return with_etag(current_app.response_class(body, mimetype='application/json'), etag)
 
 @reports_bp.route('/create-report', methods=['POST'])
 @jwt_required()
+@query_budget(4)
 def create_report():
     data = request.get_json()
-    current_user_id = get_jwt_identity()
     
     if data is None:
         return jsonify({"message": "Create report body cannot be empty"}), 400
     
-    user = User.query.get_or_404(current_user_id)
+    # Read from the token claims; no user lookup
+    user = current_identity()
     reporter_name = user.name
     reporter_id = user.id
     complainant_brgy = user.barangay_complainant
@@ -48,7 +198,6 @@ def create_report():
             **data
         )
         
-        db.session.commit()
         return jsonify({"message": f"Report Successfully Created", "report": report.to_dict()}), 201
     except ValueError as e:
         # Catches missing fields or validation failures
@@ -58,25 +207,143 @@ def create_report():
         # The "Safety Net" for everything else
         return jsonify({"error": "Internal Server Error", "details": str(e)}), 500
     
+@reports_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_reports():
+    if current_identity().role != 'agent':
+        return jsonify({"message": "Only agents are allowed to bulk import reports"}), 403
+    
+    try:
+        if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            # Parsed line by line straight off the request stream
+            records = iter_ndjson_lines(request.stream)
+        else:
+            records = iter_json_array(request.get_json(silent=True))
+        chunk_size = request.args.get('chunk_size', type=int)
+        result = ingest_reports(records, **({"chunk_size": chunk_size} if chunk_size else {}))
+    except ValueError as e:
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
+    
+    return jsonify(result), 201 if result["inserted"] else 400
+    
+@reports_bp.route('/transitions', methods=['POST'])
+@jwt_required()
+@query_budget(5)
+def transition_reports():
+    if current_identity().role != 'agent':
+        return jsonify({"message": "Only agents are allowed to change report status"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    status = data.get('status')
+    ids = data.get('ids')
+    filters = data.get('filter')
+    
+    if (ids is None) == (filters is None):
+        return jsonify({"error": "Validation Error", "details": "Provide either 'ids' or 'filter'."}), 400
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(isinstance(id, int) for id in ids) or len(ids) > MAX_BULK_TRANSITION:
+            return jsonify({"error": "Validation Error", "details": f"'ids' must be a list of 1 to {MAX_BULK_TRANSITION} report ids."}), 400
+        ids = list(dict.fromkeys(ids))
+    elif not isinstance(filters, dict) or not any(filters.get(key) for key in Report.FILTERABLE_FIELDS + ['created_from', 'created_to']):
+        # An empty filter would move every report
+        return jsonify({"error": "Validation Error", "details": f"'filter' needs at least one of {', '.join(Report.FILTERABLE_FIELDS)}, created_from, created_to."}), 400
+    
+    try:
+        result = bulk_transition(status, ids=ids, filters=filters)
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
+    
+    return jsonify(result), 200
+    
+@reports_bp.route('/claim', methods=['POST'])
+@jwt_required()
+@query_budget(7)
+def claim_next_reports():
+    identity = current_identity()
+    if identity.role != 'agent':
+        return jsonify({"message": "Only agents can claim reports"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    count = data.get('count', 1)
+    if not isinstance(count, int) or not 1 <= count <= MAX_CLAIM:
+        return jsonify({"error": "Validation Error", "details": f"'count' must be between 1 and {MAX_CLAIM}."}), 400
+    
+    # Committed straight away: claims are meant to be short transactions
+    ids = claim_reports(identity.id, count, current_app.config['REPORT_CLAIM_LEASE_SECONDS'])
+    db.session.commit()
+    
+    reports = Report.query.filter(Report.id.in_(ids)).order_by(Report.created_at, Report.id).all() if ids else []
+    return jsonify({"reports": [report.to_dict() for report in reports]}), 200
+    
+@reports_bp.route('/<int:id>/claim', methods=['PUT'])
+@jwt_required()
+@query_budget(1)
+def renew_report_claim(id):
+    lease_expires_at = renew_claim(id, current_identity().id, current_app.config['REPORT_CLAIM_LEASE_SECONDS'])
+    if lease_expires_at is None:
+        db.session.rollback()
+        return jsonify({"message": "You do not hold a claim on this report. Claim it again."}), 409
+    
+    db.session.commit()
+    return jsonify({"id": str(id), "lease_expires_at": lease_expires_at}), 200
+    
+@reports_bp.route('/<int:id>/claim', methods=['DELETE'])
+@jwt_required()
+@query_budget(1)
+def release_report_claim(id):
+    if not release_claim(id, current_identity().id):
+        db.session.rollback()
+        return jsonify({"message": "You do not hold a claim on this report."}), 409
+    
+    db.session.commit()
+    return jsonify({"message": "Report returned to the queue"}), 200
+    
 @reports_bp.route('/<int:id>', methods=['PATCH'])
 @jwt_required()
+@query_budget(6)
 def update_report(id):
     data = request.get_json()
-    report = Report.query.get(id)
+    query = Report.query.filter_by(id=id)
+    if request.if_match:
+        # Hold the row until commit so nobody slips in between check and write
+        query = query.with_for_update()
+    report = query.first()
+    
+    if report is None:
+        abort(404, description=f"Report ID {id} not found")
+    
+    if is_precondition_failed(entity_etag('report', report.id, report.updated_at)):
+        db.session.rollback()
+        return jsonify({"message": "Report was modified by someone else. Reload it and retry."}), 412
     
-    allowed_fields = ["reporter_name", "city", "description", "incident_brgy", "reporter_type", "incident_type", "location", "evidences"]
+    allowed_fields = ["reporter_name", "city", "description", "incident_brgy", "reporter_type", "incident_type", "location", "evidences", "status"]
         
     for key, value in data.items():
         if key not in allowed_fields:
             return jsonify({"message": f"You are not allowed to update the {key} field"}), 200
+        if key == 'status' and value != report.status:
+            if current_identity().role != 'agent':
+                db.session.rollback()
+                return jsonify({"message": "Only agents are allowed to change report status"}), 403
+            if value not in Report.STATUS_TRANSITIONS or report.status not in Report.transition_sources(value):
+                db.session.rollback()
+                return jsonify({"error": "Validation Error", "details": f"Cannot move a report from '{report.status}' to '{value}'."}), 400
+        if key == 'evidences':
+            try:
+                value = Report.validate_evidences(value, report.evidences)
+            except ValueError as e:
+                db.session.rollback()
+                return jsonify({"error": "Validation Error", "details": str(e)}), 400
         setattr(report, key, value)
     
     try:
         db.session.commit()
-        return jsonify({
+        return with_etag(jsonify({
             'message': 'Report info updated successfully', 
             'user': report.to_dict()
-        }), 200
+        }), entity_etag('report', report.id, report.updated_at)), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Update failed', 'error': str(e)}), 400
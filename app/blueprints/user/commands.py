@@ -0,0 +1,38 @@
+import itertools
+import json
+import click
+from app.blueprints.user.routes import user_bp
+from app.utils.ingest import iter_ndjson_lines, iter_json_array
+from app.utils.user_import import DEFAULT_CHUNK_SIZE, import_users, iter_csv_rows
+
+
+@user_bp.cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+              help='Input format. Defaults to the file extension, else NDJSON (or a JSON array).')
+@click.option('--report', '-r', type=click.File('w', encoding='utf-8'), default='-',
+              help='Where to write the per-row NDJSON report. Defaults to stdout.')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True)
+def import_user_accounts(source, fmt, report, chunk_size):
+    """Provision inactive accounts from a CSV or NDJSON file ('-' for stdin)
+    and queue their activation emails."""
+    fmt = fmt or ('csv' if source.name.endswith('.csv') else 'ndjson')
+    if fmt == 'csv':
+        records = iter_csv_rows(source)
+    else:
+        first = source.read(1)
+        while first and first.isspace():
+            first = source.read(1)
+        if first == '[':
+            records = iter_json_array(json.loads(first + source.read()))
+        else:
+            # Put the peeked character back in front of the first line
+            records = iter_ndjson_lines(itertools.chain([first + source.readline()], source))
+
+    counts = {}
+    for result in import_users(records, chunk_size=chunk_size):
+        report.write(json.dumps(result, default=str) + '\n')
+        counts[result['result']] = counts.get(result['result'], 0) + 1
+
+    summary = ', '.join(f'{count} {result}' for result, count in sorted(counts.items())) or 'no rows'
+    click.echo(f'Imported users: {summary}.', err=True)
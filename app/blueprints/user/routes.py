@@ -1,7 +1,13 @@
-from flask import Blueprint, request, jsonify, url_for, abort
+from flask import Blueprint, current_app, request, jsonify, url_for, abort
 from app.models.user import User
-from app import db, bcrypt, mail
-from flask_mail import Message
+from app.models.token_revocation import TokenRevocation
+from app import db
+from app.utils.hashing import check_password, HashingOverloaded
+from app.utils.auth import create_user_token
+from app.utils.fields import parse_fields, only_fields
+from app.utils.cache import get_cache, cache_key, fill, pack_entity, unpack_entity
+from app.utils.etag import entity_etag, is_not_modified, is_precondition_failed, with_etag, not_modified_response
+from app.utils.query_budget import query_budget
 import os
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
@@ -10,34 +16,65 @@ user_bp = Blueprint('user', __name__)
 #Get all users
 @user_bp.route('/', methods=['GET'])
 @jwt_required()
+@query_budget(1)
 def users():
-    users = User.query.all()
+    try:
+        fields = parse_fields(request.args.get('fields'), User)
+    except ValueError as e:
+        return jsonify({"error": "Validation Error", "details": str(e)}), 400
+    
+    users = only_fields(User.query, User, fields).all()
     
-    return jsonify([user.to_dict() for user in users]), 200
+    return jsonify([user.to_dict(fields) for user in users]), 200
 
 #Get user by ID
 @user_bp.route('/<uuid:id>', methods=['GET'])
 @jwt_required()
+@query_budget(1)
 def get_user(id):
-    user = User.query.filter_by(id=id).first()
+    # Read-through cache of the payload's ETag and JSON; writes drop the entry
+    # on commit. Only primary reads fill it (see fill())
+    key = cache_key('user', id)
+    cached = get_cache().get(key)
     
-    if user is None:
-        abort(404, description=f"User ID {id} not found")
+    if cached is None:
+        user = User.query.filter_by(id=id).first()
         
-    safe_user = {"id": user.id, "name": user.name, "dob": user.dob, "barangay_complainant": user.barangay_complainant, "city": user.city, "role": user.role, "contact_num": user.contact_num}
-    
-    return jsonify(safe_user), 200
+        if user is None:
+            abort(404, description=f"User ID {id} not found")
+            
+        safe_user = {"id": user.id, "name": user.name, "dob": user.dob, "barangay_complainant": user.barangay_complainant, "city": user.city, "role": user.role, "contact_num": user.contact_num}
+        etag = entity_etag('user', id, user.updated_at)
+        body = current_app.json.dumps(safe_user).encode('utf-8')
+        fill(key, pack_entity(etag, body))
+    else:
+        etag, body = unpack_entity(cached)
+    
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+    
+    return with_etag(current_app.response_class(body, mimetype='application/json'), etag), 200
 
 #Update user info by ID
 @user_bp.route('/<uuid:id>', methods=['PATCH'])
 @jwt_required()
+@query_budget(3)
 def update_user_info(id):
     current_user_id = get_jwt_identity()
-    user = User.query.get_or_404(id)
 
-    # Security: Only owner can edit
-    if current_user_id != str(user.id):
+    # Security: Only owner can edit (checked from the token, before any lookup)
+    if current_user_id != str(id):
         return jsonify({"message": "Forbidden"}), 403
+    
+    query = User.query.filter_by(id=id)
+    if request.if_match:
+        # Hold the row until commit so nobody slips in between check and write
+        query = query.with_for_update()
+    user = query.first_or_404()
+    
+    if is_precondition_failed(entity_etag('user', user.id, user.updated_at)):
+        db.session.rollback()
+        return jsonify({"message": "User was modified by someone else. Reload it and retry."}), 412
         
     data = request.get_json()
     allowed_fields = ['name', 'city', 'barangay_complainant', 'contact_num']
@@ -49,10 +86,12 @@ def update_user_info(id):
         
     try:
         db.session.commit()
-        return jsonify({
+        return with_etag(jsonify({
             'message': 'User info updated successfully', 
-            'user': user.to_dict()
-        }), 200
+            'user': user.to_dict(),
+            # name/barangay are carried in the token claims, so hand back a fresh one
+            'access_token': create_user_token(user)
+        }), entity_etag('user', user.id, user.updated_at)), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Update failed', 'error': str(e)}), 400
@@ -60,6 +99,7 @@ def update_user_info(id):
 #Change user password
 @user_bp.route('/change-password/<uuid:id>', methods=['PATCH'])
 @jwt_required()
+@query_budget(3)
 def change_password(id):
     
     current_user_id = get_jwt_identity()
@@ -75,11 +115,13 @@ def change_password(id):
 
     user = User.query.get_or_404(id)
 
-    if not bcrypt.check_password_hash(user.password_hash, current_password):
+    if not check_password(user.password_hash, current_password):
         return jsonify({"message": "Incorrect current password"}), 401
 
     try:
         user.password = new_password
+        # Every access token issued so far, including the one used here
+        TokenRevocation.revoke_user_tokens(user.id)
         db.session.commit()
         
         return jsonify({
@@ -89,6 +131,9 @@ def change_password(id):
     except ValueError as e:
         db.session.rollback()
         return jsonify({'message': 'Validation failed', 'error': str(e)}), 400
+    except HashingOverloaded:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Server error', 'error': str(e)}), 500
@@ -96,6 +141,7 @@ def change_password(id):
 #Change email route
 @user_bp.route('/change-email/<uuid:id>', methods=['PATCH'])
 @jwt_required()
+@query_budget(2)
 def change_email(id):
     current_user_id = get_jwt_identity()
     
@@ -114,18 +160,8 @@ def change_email(id):
         return jsonify({"message": "Current email can't be used as New email"}), 400
     
     try:
-        token = user.generate_activation_token(email=new_email, purpose='change-email')
-
-        activation_link = f"http://localhost:5555/auth/activate/{token}"
-
-        # 4. Send Email via Mailtrap
-        msg = Message(
-            'Activate Your VAWC DeskHub Account',
-            sender='noreply@vawc-deskhub.com',
-            recipients=[new_email]
-        )
-        msg.body = f"Hello {user.name},\n\nPlease click the link below to activate your account:\n{activation_link}"
-        mail.send(msg)
+        user.queue_activation_email(email=new_email, purpose='change-email')
+        db.session.commit()
         
         return jsonify({"message": "Registration successful. Please check your email to activate your account."}), 201
     
@@ -142,6 +178,7 @@ def change_email(id):
 #Delete user by id route
 @user_bp.route('/<uuid:id>', methods=['DELETE'])
 @jwt_required()
+@query_budget(3)
 def delete_user(id):
     user = User.query.filter_by(id=id).first()
     
@@ -149,6 +186,7 @@ def delete_user(id):
         abort(404, description=f"User ID {id} not found")
         
     db.session.delete(user)
+    TokenRevocation.revoke_user_tokens(user.id)
     db.session.commit()
     
     return jsonify({"message": "User successfully deleted"}), 204
@@ -0,0 +1,82 @@
+import click
+from app import db
+
+
+def register_cli(app):
+
+    @app.cli.command('check-query-plans')
+    @click.option('--seed-users', default=2000, show_default=True,
+                  help='Synthetic users to insert before explaining (0 to use the data as-is).')
+    @click.option('--seed-reports', default=200000, show_default=True,
+                  help='Synthetic reports to insert before explaining.')
+    def check_query_plans(seed_users, seed_reports):
+        """EXPLAIN the hot API queries and fail if any of them falls back to a
+        sequential scan. Seed data is inserted in a transaction that is always
+        rolled back, so this is safe to point at a local Postgres.
+        """
+        from app.utils.query_plans import HOT_QUERIES, seed_synthetic_data, explain, find_seq_scans
+
+        failures = 0
+        with db.engine.connect() as connection:
+            transaction = connection.begin()
+            try:
+                if seed_users or seed_reports:
+                    click.echo(f'Seeding {seed_users} users and {seed_reports} reports...')
+                    seed_synthetic_data(connection, seed_users, seed_reports)
+
+                for name, build in HOT_QUERIES.items():
+                    plan = explain(connection, build())
+                    scans = find_seq_scans(plan)
+                    if scans:
+                        failures += 1
+                        click.echo(f'FAIL  {name}: Seq Scan on {", ".join(sorted(set(scans)))}')
+                    else:
+                        click.echo(f'ok    {name}: {plan["Node Type"]}')
+            finally:
+                transaction.rollback()
+
+        if failures:
+            raise click.ClickException(f'{failures} hot quer{"y" if failures == 1 else "ies"} fell back to a sequential scan.')
+
+    @app.cli.command('mail-worker')
+    @click.option('--poll-interval', default=5.0, show_default=True,
+                  help='Seconds to wait when the outbox has nothing due.')
+    @click.option('--once', is_flag=True, help='Drain a single batch and exit.')
+    def mail_worker(poll_interval, once):
+        """Deliver queued emails from the outbox table."""
+        from app.utils.outbox import run_worker
+
+        sent = run_worker(poll_interval=poll_interval, once=once)
+        if once:
+            click.echo(f'Sent {sent} email(s).')
+
+    @app.cli.command('seed-data')
+    @click.option('--users', default=1000, show_default=True, help='Regular accounts to create.')
+    @click.option('--reports', default=100000, show_default=True, help='Reports spread over those accounts.')
+    @click.option('--agents', type=int, help='Agent accounts to create (default: 1 per 100 users).')
+    @click.option('--days', default=365, show_default=True, help='How far back report dates go.')
+    @click.option('--password', default='Bench123!', show_default=True, help='Password shared by every account.')
+    @click.option('--seed', type=int, help='Random seed for a reproducible data set.')
+    @click.option('--reset', is_flag=True, help='Delete previously generated accounts and their reports first.')
+    def seed_data(users, reports, agents, days, password, seed, reset):
+        """Bulk-load synthetic users and reports for benchmarking. Accounts
+        are bench-user<N>@seed.invalid and bench-agent<N>@seed.invalid; a
+        rerun without --reset adds accounts numbered after the existing ones.
+        """
+        from app.utils.synthetic import generate_synthetic_data, delete_synthetic_data
+
+        if reset:
+            deleted_users, deleted_reports = delete_synthetic_data()
+            click.echo(f'Deleted {deleted_users} users and {deleted_reports} reports.')
+        counts = generate_synthetic_data(users, reports, agents=agents, days=days, password=password, seed=seed)
+        click.echo(f'Created {counts["users"]} users, {counts["agents"]} agents and {counts["reports"]} reports.')
+
+    @app.cli.command('prune-token-revocations')
+    def prune_token_revocations():
+        """Delete revocations whose tokens have all expired."""
+        from datetime import datetime
+        from app.models.token_revocation import TokenRevocation
+
+        deleted = TokenRevocation.query.filter(TokenRevocation.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+        db.session.commit()
+        click.echo(f'Deleted {deleted} expired token revocation(s).')
@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime
+from app import db
+from sqlalchemy.dialects.postgresql import UUID
+
+class EvidenceUpload(db.Model):
+    """A resumable upload in progress. The bytes live in the evidence store;
+    the row tracks how many of them arrived, so any worker can take the next
+    chunk. It is deleted once the file is stored under its SHA-256.
+    """
+    __tablename__ = 'evidence_uploads'
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    report_id = db.Column(db.Integer, db.ForeignKey('reports.id', ondelete='CASCADE'), nullable=False, index=True)
+    uploader_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    received = db.Column(db.BigInteger, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<EvidenceUpload {self.id} - {self.received}/{self.size}>'
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "report_id": self.report_id,
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "size": self.size,
+            "offset": self.received
+        }
@@ -0,0 +1,40 @@
+from datetime import datetime
+from app import db
+from sqlalchemy.dialects.postgresql import JSONB
+
+class OutboxEmail(db.Model):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        # The worker polls for due pending rows in id order
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(255), nullable=False)
+    recipients = db.Column(JSONB, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.Enum('pending', 'sent', 'dead', name='outbox_status'), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    DEFAULT_SENDER = 'noreply@vawc-deskhub.com'
+
+    def __repr__(self):
+        return f'<OutboxEmail {self.id} - {self.status}>'
+
+    @staticmethod
+    def enqueue(subject, recipients, body, sender=None):
+        # Only added to the session: the caller commits it together with
+        # whatever change the email is about
+        email = OutboxEmail(
+            subject=subject,
+            sender=sender or OutboxEmail.DEFAULT_SENDER,
+            recipients=list(recipients),
+            body=body
+        )
+        db.session.add(email)
+        return email
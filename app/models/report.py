@@ -1,35 +1,172 @@
-from datetime import datetime
+import json
+from datetime import datetime, date, timedelta
 from app import db
+from app.utils.validation import check_column_values
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 class Report(db.Model):
     __tablename__ = 'reports'
+    __table_args__ = (
+        # Keyset pagination on GET /reports, alone and behind the common filters
+        db.Index('ix_reports_created_at_id', 'created_at', 'id'),
+        db.Index('ix_reports_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_reports_incident_brgy_created_at_id', 'incident_brgy', 'created_at', 'id'),
+        db.Index('ix_reports_incident_type_created_at_id', 'incident_type', 'created_at', 'id'),
+        # Foreign key lookups (User.reports) and per-reporter history
+        db.Index('ix_reports_reporter_id_created_at', 'reporter_id', 'created_at'),
+        # Full-text search over location and description
+        db.Index('ix_reports_search_vector', 'search_vector', postgresql_using='gin'),
+        # Agent work queue: the unopened backlog and the leases that can lapse
+        db.Index('ix_reports_queue_unopened', 'created_at', 'id', postgresql_where=db.text("status = 'unopened'")),
+        db.Index('ix_reports_queue_lease', 'lease_expires_at', postgresql_where=db.text("status = 'viewed'")),
+        db.Index('ix_reports_assignee_id', 'assignee_id'),
+    )
+    
+    # Text search configuration; 'simple' does no stemming, which behaves the
+    # same for English, Tagalog and mixed reports
+    SEARCH_CONFIG = 'simple'
     
     id = db.Column(db.Integer, primary_key=True)
     reporter_name = db.Column(db.String(255), nullable=False)
     
     reporter_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
-    reporter = db.relationship('User', backref=db.backref('reports', lazy=True))
+    # passive_deletes: deleting a user leaves the reporter_id check to the
+    # foreign key instead of loading every report of theirs first
+    reporter = db.relationship('User', foreign_keys=[reporter_id], backref=db.backref('reports', lazy=True, passive_deletes=True))
     
-    city = db.Column(db.String(255), nullable=False)
+    # Counted in report_stats: active_history keeps the old value around on
+    # change so the stats listener can move the count between groups
+    city = db.column_property(db.Column(db.String(255), nullable=False), active_history=True)
     description = db.Column(db.Text, nullable=False)
     complainant_brgy = db.Column(db.String(100), nullable=False)
-    incident_brgy = db.Column(db.String(100), nullable=False)
+    incident_brgy = db.column_property(db.Column(db.String(100), nullable=False), active_history=True)
     reporter_type = db.Column(db.Enum('victim', 'witness', name='reporter_types'), nullable=False)
-    incident_type = db.Column(db.Enum('Physical Abuse', 'Verbal Abuse', 'Sexual Harassment', 'Child Abuse', name='incident_types'), nullable=False)
+    incident_type = db.column_property(db.Column(db.Enum('Physical Abuse', 'Verbal Abuse', 'Sexual Harassment', 'Child Abuse', name='incident_types'), nullable=False), active_history=True)
     location = db.Column(db.String(255), nullable=False)
-    status = db.Column(db.Enum('unopened', 'viewed', 'pending', 'resolved', name='report_status'), nullable=False, default='unopened')
+    status = db.column_property(db.Column(db.Enum('unopened', 'viewed', 'pending', 'resolved', name='report_status'), nullable=False, default='unopened'), active_history=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     evidences = db.Column(JSONB)
+    # Set when an agent claims the report from the work queue; a viewed
+    # report whose lease ran out goes back to the queue
+    assignee_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='SET NULL'))
+    lease_expires_at = db.Column(db.DateTime)
+    # Filled from location and description by the reports_search_vector_update
+    # trigger (migration a91f3e57c0b8); deferred so ordinary reads never fetch it
+    search_vector = db.deferred(db.Column(TSVECTOR))
+
+    # Key prefix in the entity cache; changed rows are invalidated on commit
+    CACHE_KIND = 'report'
+    
+    # evidences holds references only: files go through the evidence upload
+    # API and are stored by SHA-256, so report reads never carry their bytes
+    MAX_EVIDENCE_ENTRIES = 20
+    MAX_EVIDENCE_ENTRY_BYTES = 1024
+    
+    # Status moves an agent may make; resolved reports can be reopened
+    STATUS_TRANSITIONS = {
+        'unopened': ['viewed', 'pending', 'resolved'],
+        'viewed': ['pending', 'resolved'],
+        'pending': ['resolved'],
+        'resolved': ['pending']
+    }
+    
+    FILTERABLE_FIELDS = ['status', 'incident_type', 'incident_brgy', 'city', 'reporter_type']
+    
+    # to_dict() key -> attribute; also the allowed values of ?fields=
+    FIELDS = {
+        "id": "id",
+        "reporter_name": "reporter_name",
+        "reporter_id": "reporter_id",
+        "city": "city",
+        "description": "description",
+        "complainant_brgy": "complainant_brgy",
+        "incident_brgy": "incident_brgy",
+        "reporter_type": "reporter_type",
+        "incident_type": "incident_type",
+        "location": "location",
+        "status": "status",
+        "evidences": "evidences",
+        "assignee_id": "assignee_id",
+        "lease_expires_at": "lease_expires_at",
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }
 
     def __repr__(self):
         return f'<Report {self.id} - {self.status}>'
 
     @staticmethod
-    def create_report(**kwargs):
+    def filter_query(query, args):
+        # args is request.args or a JSON filter object; values from the
+        # latter can be anything
+        for field in Report.FILTERABLE_FIELDS + ['created_from', 'created_to']:
+            value = args.get(field)
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"The filter '{field}' must be a string.")
+
+        for field in Report.FILTERABLE_FIELDS:
+            value = args.get(field)
+            if not value:
+                continue
+            column = getattr(Report, field)
+            # Reject unknown enum values here instead of letting Postgres raise a DataError
+            enums = getattr(column.type, 'enums', None)
+            if enums and value not in enums:
+                raise ValueError(f"Invalid value '{value}' for '{field}'.")
+            query = query.filter(column == value)
+
+        created_from = args.get('created_from')
+        if created_from:
+            query = query.filter(Report.created_at >= Report._parse_date_arg('created_from', created_from))
+
+        created_to = args.get('created_to')
+        if created_to:
+            upper = Report._parse_date_arg('created_to', created_to)
+            # A bare date means "up to the end of that day"
+            if len(created_to) == 10:
+                upper += timedelta(days=1)
+                query = query.filter(Report.created_at < upper)
+            else:
+                query = query.filter(Report.created_at <= upper)
+
+        return query
+
+    @staticmethod
+    def search_query(query, terms):
+        """Match ``terms`` (web search syntax: quotes, OR, -word) against the
+        search vector. Returns the narrowed query and its rank expression.
+        """
+        if not terms or not terms.strip():
+            raise ValueError("The search query 'q' cannot be empty.")
         
+        tsquery = db.func.websearch_to_tsquery(Report.SEARCH_CONFIG, terms)
+        # Cast to double precision so the keyset cursor compares exactly
+        rank = db.cast(db.func.ts_rank(Report.search_vector, tsquery), db.Float)
+        return query.filter(Report.search_vector.op('@@')(tsquery)), rank
+
+    @staticmethod
+    def transition_sources(status):
+        # Statuses a report may currently have to be moved to ``status``
+        if status not in Report.STATUS_TRANSITIONS:
+            raise ValueError(f"Invalid value '{status}' for 'status'.")
+        return [old for old, targets in Report.STATUS_TRANSITIONS.items() if status in targets]
+
+    @staticmethod
+    def _parse_date_arg(name, value):
+        try:
+            if len(value) == 10:
+                parsed = date.fromisoformat(value)
+                return datetime(parsed.year, parsed.month, parsed.day)
+            return datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"'{name}' must be an ISO 8601 date or datetime.")
+
+    @staticmethod
+    def validate_report_data(kwargs):
+        # Shared by create_report and bulk ingestion; returns the row to insert
         required_fields = ["reporter_name", "reporter_id", "city", "description", "complainant_brgy", 
                     "incident_brgy", "reporter_type", "incident_type", "location"]
         
@@ -44,14 +181,41 @@ class Report(db.Model):
         for param in kwargs.keys():
             if param not in all_allowed:
                 raise ValueError(f"The field '{param}' is not allowed.") 
-            
+        
+        # Catch what Postgres would otherwise reject (and take the whole batch down with)
+        check_column_values(Report.__table__, kwargs)
+        
+        data = dict(kwargs)
         # Ensure evidences is at least an empty list for JSONB consistency
-        evidences = kwargs.pop('evidences', [])
+        data['evidences'] = Report.validate_evidences(data.get('evidences'))
+        return data
+
+    @staticmethod
+    def validate_evidences(evidences, existing=()):
+        # Stored file references can be kept or dropped but not made up:
+        # only a finished upload adds one
+        if evidences is None:
+            return []
+        if not isinstance(evidences, list):
+            raise ValueError("The field 'evidences' must be a list.")
+        if len(evidences) > Report.MAX_EVIDENCE_ENTRIES:
+            raise ValueError(f"A report can have at most {Report.MAX_EVIDENCE_ENTRIES} evidences.")
+        
+        stored = {ref['sha256']: ref for ref in existing or () if isinstance(ref, dict) and 'sha256' in ref}
+        result = []
+        for entry in evidences:
+            if isinstance(entry, dict) and 'sha256' in entry:
+                if not isinstance(entry['sha256'], str) or entry['sha256'] not in stored:
+                    raise ValueError("Evidence files can only be attached by uploading them.")
+                entry = stored[entry['sha256']]
+            elif len(json.dumps(entry)) > Report.MAX_EVIDENCE_ENTRY_BYTES:
+                raise ValueError("Evidence entries must be short references; upload files through the evidence API.")
+            result.append(entry)
+        return result
 
-        new_report = Report(
-            evidences=evidences,
-            **kwargs
-        )
+    @staticmethod
+    def create_report(**kwargs):
+        new_report = Report(**Report.validate_report_data(kwargs))
         
         try:
             db.session.add(new_report)
@@ -61,20 +225,9 @@ class Report(db.Model):
             db.session.rollback()
             raise e
     
-    def to_dict(self):
-        return {
-            "id": str(self.id), 
-            "reporter_name": self.reporter_name,
-            "reporter_id": str(self.reporter_id),  
-            "city": self.city,
-            "description": self.description,
-            "complainant_brgy": self.complainant_brgy,
-            "incident_brgy": self.incident_brgy,
-            "reporter_type": self.reporter_type,
-            "incident_type": self.incident_type,
-            "location": self.location,
-            "status": self.status,
-            "evidences": self.evidences,  
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
-        }   
\ No newline at end of file
+    def to_dict(self, fields=None):
+        data = {key: getattr(self, self.FIELDS[key]) for key in (fields or self.FIELDS)}
+        if 'id' in data:
+            # Report ids have always been served as strings
+            data['id'] = str(data['id'])
+        return data
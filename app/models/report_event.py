@@ -0,0 +1,30 @@
+from datetime import datetime
+from app import db
+from sqlalchemy.dialects.postgresql import JSONB
+
+class ReportEvent(db.Model):
+    """Change feed behind GET /reports/stream.
+
+    Live delivery goes through NOTIFY; the rows are what a reconnecting
+    client replays from its Last-Event-ID. Old rows are pruned with
+    ``flask reports prune-events``.
+    """
+    __tablename__ = 'report_events'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    type = db.Column(db.Enum('report.created', 'report.status_changed', name='report_event_types'), nullable=False)
+    report_id = db.Column(db.Integer, nullable=False)
+    data = db.Column(JSONB, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<ReportEvent {self.id} - {self.type} {self.report_id}>'
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "type": self.type,
+            "report_id": self.report_id,
+            "data": self.data,
+            "created_at": self.created_at
+        }
@@ -0,0 +1,135 @@
+from collections import Counter
+from datetime import datetime
+from app import db
+from sqlalchemy import event, func, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from app.models.report import Report
+
+class ReportStat(db.Model):
+    """Running report counts per (dimension, value), e.g. ('status', 'unopened').
+
+    Kept up to date in the same transaction as every Report insert, update
+    or delete, so reading the stats costs O(groups) instead of O(reports).
+    """
+    __tablename__ = 'report_stats'
+
+    dimension = db.Column(db.String(32), primary_key=True)
+    value = db.Column(db.String(255), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    DIMENSIONS = ['incident_type', 'status', 'incident_brgy', 'city']
+
+    def __repr__(self):
+        return f'<ReportStat {self.dimension}={self.value}: {self.count}>'
+
+    @staticmethod
+    def keys_for(values, created_at):
+        keys = [(dimension, values[dimension]) for dimension in ReportStat.DIMENSIONS]
+        keys.append(('month', (created_at or datetime.utcnow()).strftime('%Y-%m')))
+        return keys
+
+    @staticmethod
+    def apply_deltas(connection, deltas):
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        # One upsert, rows in a fixed order so concurrent writers lock the
+        # counters in the same sequence and cannot deadlock each other
+        rows = [{'dimension': d, 'value': v, 'count': deltas[(d, v)]} for d, v in sorted(deltas)]
+        stmt = insert(ReportStat.__table__).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['dimension', 'value'],
+            set_={'count': ReportStat.__table__.c.count + stmt.excluded.count}
+        )
+        connection.execute(stmt)
+
+    @staticmethod
+    def rebuild():
+        # SHARE mode blocks report writes (and their counter updates) until the
+        # rebuild commits, while still letting readers through
+        db.session.execute(text('LOCK TABLE reports IN SHARE MODE'))
+        db.session.execute(ReportStat.__table__.delete())
+
+        for dimension in ReportStat.DIMENSIONS:
+            column = getattr(Report, dimension)
+            db.session.execute(
+                ReportStat.__table__.insert().from_select(
+                    ['dimension', 'value', 'count'],
+                    db.select(db.literal(dimension), db.cast(column, db.String), func.count())
+                    .group_by(column)
+                )
+            )
+
+        month = func.to_char(Report.created_at, 'YYYY-MM')
+        db.session.execute(
+            ReportStat.__table__.insert().from_select(
+                ['dimension', 'value', 'count'],
+                db.select(db.literal('month'), month, func.count())
+                .where(Report.created_at.isnot(None))
+                .group_by(month)
+            )
+        )
+        db.session.commit()
+
+    @staticmethod
+    def summary(dimensions=None):
+        query = ReportStat.query.filter(ReportStat.count > 0)
+        if dimensions:
+            query = query.filter(ReportStat.dimension.in_(dimensions))
+
+        result = {dimension: {} for dimension in (dimensions or ReportStat.DIMENSIONS + ['month'])}
+        for stat in query.order_by(ReportStat.dimension, ReportStat.value):
+            result[stat.dimension][stat.value] = stat.count
+        return result
+
+
+def _report_values(obj):
+    return {dimension: getattr(obj, dimension) for dimension in ReportStat.DIMENSIONS}
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_report_stat_deltas(session, flush_context, instances):
+    # Deleted and updated rows are read before the flush, while their old
+    # values are still there
+    deltas = session.info.setdefault('report_stat_deltas', Counter())
+
+    for obj in session.deleted:
+        if isinstance(obj, Report):
+            for key in ReportStat.keys_for(_report_values(obj), obj.created_at):
+                deltas[key] -= 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Report) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        for dimension in ReportStat.DIMENSIONS:
+            history = state.attrs[dimension].history
+            if not history.has_changes():
+                continue
+            for old in history.deleted:
+                deltas[(dimension, old)] -= 1
+            for new in history.added:
+                deltas[(dimension, new)] += 1
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_report_stat_deltas(session, flush_context):
+    # New rows are counted after the INSERT so created_at has its default.
+    # The counters go out on the flush's connection, so they commit or roll
+    # back together with the reports themselves
+    deltas = session.info.pop('report_stat_deltas', Counter())
+
+    for obj in session.new:
+        if isinstance(obj, Report):
+            for key in ReportStat.keys_for(_report_values(obj), obj.created_at):
+                deltas[key] += 1
+
+    if deltas:
+        ReportStat.apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_report_stat_deltas(session, previous_transaction):
+    session.info.pop('report_stat_deltas', None)
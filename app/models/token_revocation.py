@@ -0,0 +1,48 @@
+from datetime import datetime
+from flask_jwt_extended.config import config as jwt_config
+from app import db
+from sqlalchemy.dialects.postgresql import UUID
+
+class TokenRevocation(db.Model):
+    """A revoked access token (``jti``) or every token issued to a user
+    before ``not_before``. Workers keep these in memory (see
+    app.utils.revocation), so checking a token costs no query.
+
+    No foreign key to users: revoking a deleted user's tokens must outlive
+    the user row. A row is useless once ``expires_at`` has passed, since
+    every token it could block has expired by then.
+    """
+    __tablename__ = 'token_revocations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36))
+    user_id = db.Column(UUID(as_uuid=True))
+    not_before = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)
+    # Database time: workers sync from the newest row they have seen
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), index=True)
+
+    def __repr__(self):
+        return f'<TokenRevocation {self.jti or self.user_id}>'
+
+    @staticmethod
+    def revoke_token(jti, expires_at):
+        # Only added to the session: the caller commits it
+        revocation = TokenRevocation(jti=jti, expires_at=expires_at)
+        db.session.add(revocation)
+        return revocation
+
+    @staticmethod
+    def revoke_user_tokens(user_id):
+        # Whole seconds, like the tokens' iat: tokens issued in the same
+        # second stay valid, so logging in right after a password change works
+        now = datetime.utcnow().replace(microsecond=0)
+        # False when access tokens never expire
+        token_lifetime = jwt_config.access_expires
+        revocation = TokenRevocation(
+            user_id=user_id,
+            not_before=now,
+            expires_at=now + token_lifetime if token_lifetime else None
+        )
+        db.session.add(revocation)
+        return revocation
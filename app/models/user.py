@@ -1,5 +1,6 @@
 from datetime import datetime
-from app import db, bcrypt  # Using your initialized instances
+from app import db
+from app.utils.hashing import hash_password, check_password, needs_rehash
 from sqlalchemy.orm import validates
 import re
 from itsdangerous import URLSafeTimedSerializer
@@ -25,6 +26,9 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Key prefix in the entity cache; changed rows are invalidated on commit
+    CACHE_KIND = 'user'
+
     @property
     def password(self):
         raise AttributeError('Password is not a readable attribute.')
@@ -33,8 +37,8 @@ class User(db.Model):
     def password(self, password):
         # This will trigger the @validates('password') method below
         self.validate_password('password', password)
-        # If validation passes, hash it and store it
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        # If validation passes, hash it (in the bcrypt pool) and store it
+        self.password_hash = hash_password(password)
         
     # --- PH Contact Number Validation ---
     @validates('contact_num')
@@ -67,24 +71,41 @@ class User(db.Model):
         if not re.search(special_chars_regex, password):
             raise ValueError('Password must contain at least one special character.')
     
-    def to_dict(self):
-            return {
-                "id": self.id,
-                "name": self.name,
-                "dob": self.dob,
-                "complainant_brgy": self.barangay_complainant,
-                "contact_num": self.contact_num,
-                "email": self.email,
-                "city": self.city,
-                "role": self.role,
-                "created_at": self.created_at.isoformat() # Dates must be converted to strings
-            }
+    # to_dict() key -> attribute; also the allowed values of ?fields=
+    FIELDS = {
+        "id": "id",
+        "name": "name",
+        "dob": "dob",
+        "complainant_brgy": "barangay_complainant",
+        "contact_num": "contact_num",
+        "email": "email",
+        "city": "city",
+        "role": "role",
+        "created_at": "created_at"
+    }
+    
+    def to_dict(self, fields=None):
+        # UUID/date/datetime values are serialized by the app's JSON provider
+        return {key: getattr(self, self.FIELDS[key]) for key in (fields or self.FIELDS)}
              
     def generate_activation_token(self, email=None, purpose='activate'):
         email_to_encode = email if email else self.email
         serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
         return serializer.dumps({'user_id': str(self.id), 'new_email': email_to_encode, "purpose": purpose}, salt='email-confirm')
     
+    def queue_activation_email(self, email=None, purpose='activate'):
+        # Written to the outbox in the caller's transaction; the mail worker sends it
+        from app.models.outbox import OutboxEmail
+        
+        token = self.generate_activation_token(email=email, purpose=purpose)
+        activation_link = f"{current_app.config['ACTIVATION_URL_BASE']}/{token}"
+        
+        return OutboxEmail.enqueue(
+            'Activate Your VAWC DeskHub Account',
+            recipients=[email or self.email],
+            body=f"Hello {self.name},\n\nPlease click the link below to activate your account:\n{activation_link}"
+        )
+    
     @staticmethod
     def create_inactive_user(name, dob, city, barangay, contact_num, email, is_active, password, id_url, role='user'):
         if not email or not password:
@@ -106,11 +127,19 @@ class User(db.Model):
             role=role
         )
             
-        new_user.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        new_user.password_hash = hash_password(password)
         
-        db.session.add(new_user)
-        db.session.commit()
-        return new_user
+        try:
+            db.session.add(new_user)
+            # Flush to get the user id for the activation token, then commit the
+            # user and its activation email together
+            db.session.flush()
+            new_user.queue_activation_email()
+            db.session.commit()
+            return new_user
+        except Exception as e:
+            db.session.rollback()
+            raise e
             
     @staticmethod
     def login(email, password):
@@ -122,8 +151,13 @@ class User(db.Model):
         if not user:
             raise ValueError("Incorrect email address")
 
-        if not bcrypt.check_password_hash(user.password_hash, password):
+        if not check_password(user.password_hash, password):
             raise ValueError("Incorrect password")
+        
+        # Upgrade hashes made with an older BCRYPT_LOG_ROUNDS while we have the plaintext
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            db.session.commit()
 
         return user
     
@@ -0,0 +1,74 @@
+import os
+from flask import current_app, g
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+# Benchmark knob: one server-side sleep per request stands in for a slow
+# database without blocking either serving mode's scheduler
+SIMULATED_LATENCY_SQL = text('SELECT pg_sleep(:seconds)')
+
+
+def async_database_uri(database_uri):
+    url = make_url(database_uri)
+    if url.get_backend_name() != 'postgresql':
+        raise RuntimeError('The async serving mode needs a PostgreSQL DATABASE_URI.')
+    return url.set(drivername='postgresql+asyncpg')
+
+
+def init_async_db(app):
+    """Create the asyncpg engines used by the async views (app.asgi): one for
+    the primary and one per read replica bind. Returns them all.
+
+    Pool settings come from the same DB_* variables as the sync engines;
+    ASYNC_DB_POOL_SIZE and ASYNC_DB_MAX_OVERFLOW size the async pools on
+    their own, since they serve alongside the sync app's pools.
+    """
+    # Optional dependencies: only the ASGI entry point needs them
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from app.utils.metrics import instrument_sql
+
+    uris = {None: app.config['SQLALCHEMY_DATABASE_URI']}
+    uris.update({key: uri for key, uri in (app.config.get('SQLALCHEMY_BINDS') or {}).items() if key.startswith('replica')})
+
+    engines = {}
+    for key, uri in uris.items():
+        engine = create_async_engine(
+            async_database_uri(uri),
+            pool_size=int(os.getenv('ASYNC_DB_POOL_SIZE', os.getenv('DB_POOL_SIZE', 5))),
+            max_overflow=int(os.getenv('ASYNC_DB_MAX_OVERFLOW', os.getenv('DB_MAX_OVERFLOW', 5))),
+            pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            pool_pre_ping=os.getenv('DB_POOL_PRE_PING', 'True') == 'True',
+            connect_args={'timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5))}
+        )
+        # SQL issued by async views shows up in the per-request metrics too
+        instrument_sql(engine.sync_engine)
+        engines[key] = engine
+    app.extensions['async_db'] = {key: async_sessionmaker(engine, expire_on_commit=False) for key, engine in engines.items()}
+    return list(engines.values())
+
+
+def async_session():
+    # Same replica pick as the sync session (app.utils.replicas): lag,
+    # read-your-writes and @read_from_primary all apply
+    from app.utils.replicas import replica_for_request
+
+    sessions = current_app.extensions['async_db']
+    return sessions.get(replica_for_request(), sessions[None])()
+
+
+async def simulate_db_latency(session):
+    latency_ms = current_app.config.get('DB_SIMULATED_LATENCY_MS')
+    if latency_ms:
+        await session.execute(SIMULATED_LATENCY_SQL, {'seconds': latency_ms / 1000})
+
+
+def init_simulated_latency(app, db):
+    if not app.config.get('DB_SIMULATED_LATENCY_MS'):
+        return
+
+    @app.before_request
+    def simulate_sync_db_latency():
+        # Async views await their own sleep instead of blocking the event loop
+        if not g.get('async_view'):
+            db.session.execute(SIMULATED_LATENCY_SQL, {'seconds': app.config['DB_SIMULATED_LATENCY_MS'] / 1000})
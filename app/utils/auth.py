@@ -0,0 +1,37 @@
+import uuid
+from collections import namedtuple
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
+
+# Bump when the set of identity claims changes, so old tokens take the fallback path
+CLAIMS_VERSION = 1
+
+TokenIdentity = namedtuple('TokenIdentity', ['id', 'name', 'role', 'barangay_complainant'])
+
+
+def identity_claims(user):
+    return {
+        "cv": CLAIMS_VERSION,
+        "name": user.name,
+        "role": user.role,
+        "brgy": user.barangay_complainant
+    }
+
+
+def create_user_token(user):
+    return create_access_token(identity=str(user.id), additional_claims=identity_claims(user))
+
+
+def current_identity():
+    """Who is calling, read from the access token claims.
+
+    Only tokens minted before the claims existed cost a user lookup.
+    """
+    claims = get_jwt()
+    user_id = uuid.UUID(get_jwt_identity())
+
+    if claims.get('cv') == CLAIMS_VERSION:
+        return TokenIdentity(user_id, claims['name'], claims['role'], claims['brgy'])
+
+    from app.models.user import User
+    user = User.query.get_or_404(user_id)
+    return TokenIdentity(user.id, user.name, user.role, user.barangay_complainant)
@@ -0,0 +1,305 @@
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from importlib import import_module
+from flask import current_app, g
+from sqlalchemy import event, func
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Workers tell each other which keys a commit invalidated on this channel
+CHANNEL = 'entity_cache_invalidations'
+# NOTIFY payloads must stay under 8000 bytes
+MAX_NOTIFY_BYTES = 7000
+LISTEN_POLL_SECONDS = 5
+LISTEN_RETRY_SECONDS = 1
+LISTEN_READY_TIMEOUT = 5
+
+
+class CacheBackend:
+    """Interface for entity caches. Backends store bytes values by string key
+    and keep their own hit/miss counters; a shared store (e.g. Redis) only has
+    to implement these methods (and set ``shared``) to replace the in-process
+    default.
+    """
+
+    # A backend private to the process gets every other worker's
+    # invalidations relayed to it over Postgres NOTIFY
+    shared = False
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    shared = True
+
+    def __init__(self, **options):
+        self.misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {"backend": "null", "hits": 0, "misses": self.misses, "hit_ratio": 0.0}
+
+
+class LRUTTLCache(CacheBackend):
+    """Bounded in-process cache: at most ``max_entries`` values, each valid for
+    ``ttl`` seconds. Least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_entries=10000, ttl=60, **options):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+BACKENDS = {
+    'memory': LRUTTLCache,
+    'null': NullCache
+}
+
+
+def init_cache(app):
+    backend = app.config.get('ENTITY_CACHE_BACKEND', 'memory')
+    if backend in BACKENDS:
+        backend_class = BACKENDS[backend]
+    else:
+        # 'package.module:ClassName' for out-of-tree backends
+        module_name, _, class_name = backend.partition(':')
+        backend_class = getattr(import_module(module_name), class_name)
+
+    cache = backend_class(
+        max_entries=app.config.get('ENTITY_CACHE_MAX_ENTRIES', 10000),
+        ttl=app.config.get('ENTITY_CACHE_TTL', 60)
+    )
+    app.extensions['entity_cache'] = cache
+
+    with app.app_context():
+        engine = db.engine
+    if not cache.shared and engine.dialect.name == 'postgresql':
+        app.extensions['entity_cache_listener'] = InvalidationListener(engine, cache)
+
+
+def get_cache():
+    listener = current_app.extensions.get('entity_cache_listener')
+    if listener is not None:
+        listener.start()
+    return current_app.extensions['entity_cache']
+
+
+def cache_key(kind, id):
+    return f'{kind}:{id}'
+
+
+def fill(key, value):
+    # A replica read may predate a commit whose invalidation already ran:
+    # cached, that stale copy would be served to everyone for the whole TTL
+    if g.get('db_replica') is None:
+        get_cache().set(key, value)
+
+
+def invalidate(kind, *ids):
+    get_cache().delete(*[cache_key(kind, id) for id in ids])
+
+
+def pack_entity(etag, body):
+    # Cached value of an entity: its ETag and its JSON body, as one bytes
+    # value any backend can store
+    return etag.encode('ascii') + b'\n' + body
+
+
+def unpack_entity(value):
+    etag, _, body = value.partition(b'\n')
+    return etag.decode('ascii'), body
+
+
+def invalidate_on_commit(session, kind, *ids):
+    # For bulk statements that bypass the flush: the keys are dropped with
+    # the ones the listeners below collect, once the transaction commits
+    keys = {cache_key(kind, id) for id in ids}
+    session.info.setdefault('cache_invalidations', set()).update(keys)
+    _notify_invalidations(session, keys)
+
+
+def _notify_invalidations(session, keys):
+    # Sent in the writing transaction: other workers hear about the keys if
+    # and when it commits
+    if not keys:
+        return
+    connection = session.connection(bind_arguments={'bind': db.engine})
+    if connection.dialect.name != 'postgresql':
+        return
+    payload = []
+    for key in sorted(keys):
+        if payload and sum(len(k) + 1 for k in payload) + len(key) > MAX_NOTIFY_BYTES:
+            connection.execute(sql_select(func.pg_notify(CHANNEL, ','.join(payload))))
+            payload = []
+        payload.append(key)
+    connection.execute(sql_select(func.pg_notify(CHANNEL, ','.join(payload))))
+
+
+class InvalidationListener:
+    """Drops the keys other workers' commits invalidated from this worker's
+    cache. A background thread LISTENs on Postgres; while it is reconnecting
+    invalidations may be missed, so the whole cache is cleared once it is
+    back.
+    """
+
+    def __init__(self, engine, cache):
+        self.engine = engine
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._thread = None
+        self._listening = threading.Event()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            # Started on first use, so it runs in the worker, never in a
+            # pre-fork master
+            self._thread = threading.Thread(target=self._listen, name='entity-cache-invalidations', daemon=True)
+            self._thread.start()
+        # Entries cached before LISTEN took effect could miss their invalidation
+        self._listening.wait(LISTEN_READY_TIMEOUT)
+
+    def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                # Kept out of the pool: it sits in LISTEN for the life of the worker
+                connection.detach()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+
+                if self._listening.is_set():
+                    self.cache.clear()
+                self._listening.set()
+
+                while True:
+                    if select.select([dbapi_connection], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    keys = [key for notify in dbapi_connection.notifies for key in notify.payload.split(',')]
+                    dbapi_connection.notifies.clear()
+                    self.cache.delete(*keys)
+            except Exception:
+                logger.exception('Entity cache invalidation listener failed, reconnecting')
+                time.sleep(LISTEN_RETRY_SECONDS)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+# Models opt in with a CACHE_KIND class attribute. Keys of rows changed in a
+# flush are collected, then dropped once the transaction commits: at once in
+# this worker, through NOTIFY in the others. A reader that loaded the old row
+# just before the commit can still re-cache it; the TTL bounds how long that
+# stale copy lives.
+@event.listens_for(Session, 'after_flush')
+def _collect_cache_invalidations(session, flush_context):
+    keys = set()
+    for obj in list(session.dirty) + list(session.deleted):
+        kind = getattr(type(obj), 'CACHE_KIND', None)
+        if kind is not None:
+            keys.add(cache_key(kind, obj.id))
+    session.info.setdefault('cache_invalidations', set()).update(keys)
+    _notify_invalidations(session, keys)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_cache_invalidations(session):
+    keys = session.info.pop('cache_invalidations', None)
+    if keys:
+        get_cache().delete(*keys)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_cache_invalidations(session, previous_transaction):
+    # A savepoint rollback keeps the keys: invalidating too much is harmless
+    if previous_transaction.parent is None:
+        session.info.pop('cache_invalidations', None)
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+def engine_options_from_env(database_uri):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from DB_* environment variables.
+
+    Defaults suit gunicorn: a small pool per worker, a short overflow, stale
+    connections detected with pre-ping and recycled before typical
+    server/LB idle timeouts, and a bounded wait instead of hanging forever.
+    """
+    if not database_uri or database_uri.startswith('sqlite'):
+        # SQLite uses its own single-connection pools
+        return {}
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True') == 'True',
+        'connect_args': {'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5))}
+    }
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_peak = 0
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds, overflow):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self.overflow_peak = max(self.overflow_peak, overflow)
+
+    def snapshot(self, pool):
+        with self._lock:
+            stats = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "overflow_peak": self.overflow_peak
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow()
+            })
+        stats["pool"] = pool.__class__.__name__
+        return stats
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long callers wait for a connection (queueing
+    plus, for a fresh connection, the connect itself)."""
+
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.incr('timeouts')
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start, self.overflow())
+
+    def recreate(self):
+        # Keep counting after dispose()/invalidation swaps the pool out
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument_engine(engine):
+    metrics = PoolMetrics()
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+
+    event.listen(engine, 'connect', lambda *args: metrics.incr('connects'))
+    event.listen(engine, 'checkout', lambda *args: metrics.incr('checkouts'))
+    event.listen(engine, 'checkin', lambda *args: metrics.incr('checkins'))
+    event.listen(engine, 'invalidate', lambda *args: metrics.incr('invalidations'))
+    event.listen(engine, 'soft_invalidate', lambda *args: metrics.incr('soft_invalidations'))
+    return metrics
+
+
+def init_pool_metrics(app, db):
+    with app.app_context():
+        app.extensions['pool_metrics'] = {
+            bind or 'default': (engine, instrument_engine(engine))
+            for bind, engine in db.engines.items()
+        }
+
+
+def pool_stats(app):
+    return {
+        bind: metrics.snapshot(engine.pool)
+        for bind, (engine, metrics) in app.extensions.get('pool_metrics', {}).items()
+    }
@@ -0,0 +1,43 @@
+import hashlib
+from datetime import datetime
+from flask import current_app, request
+
+# Reports are private data: clients may keep a copy but must revalidate it
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts):
+    raw = '|'.join(p.isoformat() if isinstance(p, datetime) else str(p) for p in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def entity_etag(kind, id, updated_at, fields=None):
+    # The field list is part of the representation, so part of the tag
+    return make_etag(kind, id, updated_at, ','.join(fields or ()))
+
+
+def fieldset_etag(etag, fields):
+    # A ?fields= subset is its own representation of the same entity version
+    return make_etag(etag, ','.join(fields)) if fields else etag
+
+
+def is_not_modified(etag):
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    return etag is not None and request.if_none_match.contains_weak(etag)
+
+
+def is_precondition_failed(etag):
+    # If-Match uses the strong comparison; '*' only needs the entity to exist
+    if not request.if_match:
+        return False
+    return etag is None or not request.if_match.contains(etag)
+
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def not_modified_response(etag):
+    return with_etag(current_app.response_class(status=304), etag)
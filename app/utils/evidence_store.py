@@ -0,0 +1,153 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from flask import current_app
+
+READ_SIZE = 64 * 1024
+
+
+class EvidenceStore:
+    """Evidence files on the local filesystem.
+
+    Uploads are assembled in ``uploads/<upload id>.part`` and, once complete,
+    stored as ``blobs/ab/cd/<sha256>``. Identical files are stored once, no
+    matter how many reports reference them.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(os.path.join(root, 'uploads'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'blobs'), exist_ok=True)
+
+    def part_path(self, upload_id):
+        return os.path.join(self.root, 'uploads', f'{upload_id}.part')
+
+    def blob_path(self, sha256):
+        return os.path.join(self.root, 'blobs', sha256[:2], sha256[2:4], sha256)
+
+    def append(self, upload_id, offset, stream, length):
+        """Write ``length`` bytes from ``stream`` at ``offset`` and return how
+        many arrived. Anything past ``offset`` left by an interrupted earlier
+        attempt is dropped first.
+        """
+        path = self.part_path(upload_id)
+        written = 0
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.seek(offset)
+            f.truncate()
+            while written < length:
+                chunk = stream.read(min(READ_SIZE, length - written))
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        return written
+
+    def commit(self, upload_id):
+        """Hash a finished upload and store it under its content address.
+        Returns the SHA-256; an identical blob already stored is kept.
+
+        The part file stays until discard(): call that once the reference to
+        the blob is committed, so a failed commit can retry the last chunk.
+        """
+        path = self.part_path(upload_id)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(READ_SIZE), b''):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        target = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            # A hard link: the bytes are not copied, and the blob appears
+            # complete or not at all
+            os.link(path, target)
+        except FileExistsError:
+            # Fresh again, so prune() leaves it alone until the reference
+            # to it has been committed
+            os.utime(target)
+        return sha256
+
+    def part_size(self, upload_id):
+        try:
+            return os.path.getsize(self.part_path(upload_id))
+        except FileNotFoundError:
+            return 0
+
+    def put(self, data):
+        """Store ``data`` (bytes) and return its SHA-256."""
+        upload_id = uuid.uuid4()
+        with open(self.part_path(upload_id), 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        sha256 = self.commit(upload_id)
+        self.discard(upload_id)
+        return sha256
+
+    def discard(self, upload_id):
+        try:
+            os.remove(self.part_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, keep_uploads, keep_blobs, min_age):
+        """Delete part files whose upload id is not in ``keep_uploads`` and
+        blobs whose SHA-256 is not in ``keep_blobs``. Files modified in the
+        last ``min_age`` seconds are kept: their upload or reference may not
+        be committed yet. Returns (parts deleted, blobs deleted).
+        """
+        cutoff = time.time() - min_age
+        parts = blobs = 0
+        for entry in os.scandir(os.path.join(self.root, 'uploads')):
+            upload_id = entry.name[:-len('.part')]
+            if entry.name.endswith('.part') and upload_id not in keep_uploads and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                parts += 1
+        for directory, _, names in os.walk(os.path.join(self.root, 'blobs')):
+            for name in names:
+                path = os.path.join(directory, name)
+                if name not in keep_blobs and os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    blobs += 1
+        return parts, blobs
+
+
+# data:<content type>;base64,<bytes>, how files were sent before the upload API
+DATA_URI = re.compile(r'data:([\w.+-]+/[\w.+-]+)?(?:;[^,;]*)*;base64,(.*)', re.DOTALL)
+
+
+def inline_to_ref(store, entry, position):
+    """Store an inline evidence entry from before the upload API and return
+    the reference that replaces it. Data URIs are decoded to their file;
+    anything else is kept as a JSON file."""
+    match = DATA_URI.fullmatch(entry) if isinstance(entry, str) else None
+    if match:
+        try:
+            data = base64.b64decode(match.group(2), validate=True)
+        except (binascii.Error, ValueError):
+            match = None
+    if match:
+        content_type = match.group(1) or 'application/octet-stream'
+        filename = f'evidence-{position}'
+    else:
+        data = json.dumps(entry).encode('utf-8')
+        content_type = 'application/json'
+        filename = f'evidence-{position}.json'
+    return {"sha256": store.put(data), "filename": filename, "content_type": content_type, "size": len(data)}
+
+
+def init_evidence_store(app):
+    app.extensions['evidence_store'] = EvidenceStore(app.config['EVIDENCE_STORE_PATH'])
+
+
+def get_evidence_store():
+    return current_app.extensions['evidence_store']
@@ -0,0 +1,57 @@
+import csv
+import io
+from datetime import date
+from flask import current_app
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# Flush CSV output once the buffer grows past this many characters
+CSV_FLUSH_SIZE = 64 * 1024
+
+
+def stream_query(query):
+    # yield_per turns on stream_results, so psycopg uses a named (server-side)
+    # cursor and only EXPORT_BATCH_SIZE rows are held in memory at a time
+    return query.yield_per(EXPORT_BATCH_SIZE)
+
+
+def iter_ndjson(rows, fields=None):
+    dumps = current_app.json.dumps
+    for row in rows:
+        yield dumps(row.to_dict(fields)) + '\n'
+
+
+def iter_csv(rows, fieldnames, fields=None):
+    dumps = current_app.json.dumps
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields or fieldnames, extrasaction='ignore')
+    writer.writeheader()
+
+    for row in rows:
+        record = row.to_dict(fields)
+        for key, value in record.items():
+            if isinstance(value, (dict, list)):
+                record[key] = dumps(value)
+            elif isinstance(value, date):
+                record[key] = value.isoformat()
+        writer.writerow(record)
+
+        if buffer.tell() >= CSV_FLUSH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+def iter_export(rows, fmt, fieldnames, fields=None):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+    if fmt == 'csv':
+        return iter_csv(rows, fieldnames, fields)
+    return iter_ndjson(rows, fields)
@@ -0,0 +1,25 @@
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(value, model):
+    """Parse a ``?fields=a,b,c`` sparse fieldset against ``model.FIELDS``.
+
+    Returns ``None`` (every field) when the parameter is absent.
+    """
+    if not value:
+        return None
+
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in model.FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(model.FIELDS)}.")
+    return fields
+
+
+def only_fields(query, model, fields, always=()):
+    # Narrow the SELECT to the requested columns (plus any the caller needs,
+    # e.g. pagination keys), so unused Text/JSONB columns are never loaded
+    if not fields:
+        return query
+    attributes = {model.FIELDS[field] for field in fields} | set(always)
+    return query.options(load_only(*[getattr(model, attr) for attr in attributes]))
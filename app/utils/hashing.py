@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt as _bcrypt
+from flask import current_app
+from werkzeug.exceptions import TooManyRequests
+
+DEFAULT_LOG_ROUNDS = 12
+# Hashes handed to a pool process at a time by HashingPool.map
+CHUNK_SIZE = 8
+
+
+class HashingOverloaded(TooManyRequests):
+    description = 'The server is busy processing other logins. Please retry shortly.'
+
+
+# bcrypt runs in these functions inside the pool processes, so they must stay
+# importable module-level callables
+def _hashpw(password, rounds):
+    return _bcrypt.hashpw(password, _bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _checkpw(password, password_hash):
+    return _bcrypt.checkpw(password, password_hash)
+
+
+class HashingPool:
+    """Runs bcrypt in a bounded process pool so request threads stay free for
+    cheap endpoints, and rejects work once ``max_pending`` hashes are queued
+    instead of letting logins pile up behind each other.
+
+    There is one pool per worker process and the limit applies per worker,
+    across its request threads. It only sheds anything with threaded workers
+    (gunicorn.conf.py runs gthread): a single-threaded worker never has more
+    than one hash in flight.
+    """
+
+    def __init__(self, size_setting='BCRYPT_POOL_SIZE'):
+        # Config key holding the number of processes
+        self.size_setting = size_setting
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._slots = None
+        self._size = None
+
+    def _configure(self):
+        size = current_app.config.get(self.size_setting, os.cpu_count() or 1)
+        max_pending = current_app.config.get('BCRYPT_MAX_PENDING') or max(size, 1) * 2
+
+        with self._lock:
+            # A forked worker inherits the parent's executor object but not its
+            # processes, so everything is rebuilt once per process
+            if self._pid == os.getpid():
+                return
+            self._size = size
+            self._slots = threading.BoundedSemaphore(max_pending)
+            self._executor = None
+            if size > 0:
+                context = multiprocessing.get_context('forkserver')
+                self._executor = ProcessPoolExecutor(max_workers=size, mp_context=context)
+            self._pid = os.getpid()
+
+    def run(self, fn, *args):
+        self._configure()
+
+        if not self._slots.acquire(blocking=False):
+            retry_after = current_app.config.get('BCRYPT_RETRY_AFTER', 1)
+            raise HashingOverloaded(retry_after=retry_after)
+        try:
+            if self._executor is None:
+                return fn(*args)
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def map(self, fn, *iterables):
+        """Run ``fn`` over the iterables on every pool process at once.
+
+        For batch jobs (CLI imports), on ``batch_pool``: it does not take
+        request slots, so a view calling it would starve logins.
+        """
+        self._configure()
+        if self._executor is None:
+            return list(map(fn, *iterables))
+        return list(self._executor.map(fn, *iterables, chunksize=CHUNK_SIZE))
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pid = None
+
+
+pool = HashingPool()
+# Sized to every core: only batch jobs use it, never a server worker
+batch_pool = HashingPool('BCRYPT_BATCH_POOL_SIZE')
+
+
+def _log_rounds():
+    return current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+
+
+def hash_password(password):
+    return pool.run(_hashpw, password.encode('utf-8'), _log_rounds())
+
+
+def hash_passwords(passwords):
+    rounds = _log_rounds()
+    return batch_pool.map(_hashpw, [password.encode('utf-8') for password in passwords], [rounds] * len(passwords))
+
+
+def check_password(password_hash, password):
+    return pool.run(_checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def needs_rehash(password_hash):
+    # bcrypt hashes look like $2b$<cost>$<salt+digest>
+    try:
+        cost = int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return True
+    return cost != _log_rounds()
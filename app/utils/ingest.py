@@ -0,0 +1,133 @@
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import insert
+from app import db
+from app.models.report import Report
+from app.models.report_stat import ReportStat
+from app.models.user import User
+from app.utils.report_events import CREATED_FIELDS, record_report_events
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def iter_ndjson_lines(lines):
+    """Yield ``(row_number, record)`` for every non-blank NDJSON line.
+
+    Lines that are not JSON objects come through as ValueError instances so
+    they are reported like any other invalid row.
+    """
+    row = 0
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row, ValueError("Row is not valid JSON.")
+            continue
+        yield row, record
+
+
+def iter_json_array(records):
+    if not isinstance(records, list):
+        raise ValueError("Expected a JSON array of reports.")
+    for row, record in enumerate(records, start=1):
+        yield row, record
+
+
+def _validate(record):
+    if isinstance(record, ValueError):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Each row must be a JSON object.")
+
+    data = Report.validate_report_data(record)
+    try:
+        data['reporter_id'] = uuid.UUID(str(data['reporter_id']))
+    except ValueError:
+        raise ValueError("The field 'reporter_id' must be a UUID.")
+    data.setdefault('status', 'unopened')
+    return data
+
+
+def _insert_chunk(chunk, errors):
+    # One lookup per chunk instead of letting a single unknown reporter_id
+    # fail the foreign key and the whole INSERT with it
+    reporter_ids = {data['reporter_id'] for _, data in chunk}
+    known = {row.id for row in db.session.query(User.id).filter(User.id.in_(reporter_ids))}
+
+    rows = []
+    row_numbers = []
+    for row, data in chunk:
+        if data['reporter_id'] in known:
+            rows.append(data)
+            row_numbers.append(row)
+        else:
+            errors.append((row, f"Reporter {data['reporter_id']} does not exist."))
+    if not rows:
+        return 0
+
+    now = datetime.utcnow()
+    deltas = Counter()
+    for data in rows:
+        data['created_at'] = data['updated_at'] = now
+        for key in ReportStat.keys_for(data, now):
+            deltas[key] += 1
+
+    try:
+        with db.session.begin_nested():
+            # Core insert with a list of rows: one multi-row INSERT per
+            # chunk instead of a unit-of-work flush per report. It bypasses
+            # the flush hooks, so the stats deltas and the report.created
+            # events are written here
+            ids = db.session.execute(insert(Report).returning(Report.id, sort_by_parameter_order=True), rows).scalars().all()
+            ReportStat.apply_deltas(db.session.connection(), deltas)
+            record_report_events(db.session, [
+                ('report.created', id, {field: data[field] for field in CREATED_FIELDS})
+                for id, data in zip(ids, rows)
+            ])
+    except Exception as e:
+        # Rows rejected above already have their error
+        for row in row_numbers:
+            errors.append((row, f"Chunk insert failed: {e.__class__.__name__}"))
+        return 0
+    return len(rows)
+
+
+def ingest_reports(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Validate and insert ``(row_number, record)`` pairs chunk by chunk.
+
+    Invalid rows are skipped and reported; they never abort the batch.
+    Every chunk is committed on its own so memory stays bounded.
+    """
+    inserted = 0
+    errors = []
+    chunk = []
+
+    for row, record in records:
+        try:
+            chunk.append((row, _validate(record)))
+        except ValueError as e:
+            errors.append((row, str(e)))
+
+        if len(chunk) >= chunk_size:
+            inserted += _insert_chunk(chunk, errors)
+            db.session.commit()
+            chunk = []
+
+    if chunk:
+        inserted += _insert_chunk(chunk, errors)
+        db.session.commit()
+
+    errors.sort()
+    return {
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": [{"row": row, "error": error} for row, error in errors[:MAX_REPORTED_ERRORS]]
+    }
@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from flask import g, request, has_request_context, jsonify
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Statements kept per request for the slow-request log
+MAX_LOGGED_STATEMENTS = 50
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Per-process request and SQL metrics, rendered in the Prometheus text
+    format. Each gunicorn worker keeps its own registry; scrape every worker
+    or aggregate upstream.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.responses = defaultdict(int)
+        self.sql_seconds = defaultdict(float)
+
+    def record(self, endpoint, method, status, seconds, sql_count, sql_seconds):
+        with self._lock:
+            self.latency[(endpoint, method)].observe(seconds)
+            self.queries[(endpoint, method)].observe(sql_count)
+            self.responses[(endpoint, method, status)] += 1
+            self.sql_seconds[(endpoint, method)] += sql_seconds
+
+    def render(self, extra_gauges=()):
+        lines = []
+        with self._lock:
+            _render_histogram(lines, 'http_request_duration_seconds',
+                              'Request latency by endpoint.', self.latency)
+            _render_histogram(lines, 'http_request_sql_queries',
+                              'SQL statements issued per request.', self.queries)
+
+            lines.append('# HELP http_responses_total Responses by endpoint and status code.')
+            lines.append('# TYPE http_responses_total counter')
+            for (endpoint, method, status), value in sorted(self.responses.items()):
+                lines.append(f'http_responses_total{_labels(endpoint=endpoint, method=method, status=status)} {value}')
+
+            lines.append('# HELP http_request_sql_seconds_total Time spent in SQL by endpoint.')
+            lines.append('# TYPE http_request_sql_seconds_total counter')
+            for (endpoint, method), value in sorted(self.sql_seconds.items()):
+                lines.append(f'http_request_sql_seconds_total{_labels(endpoint=endpoint, method=method)} {value:.6f}')
+
+        for name, help_text, samples in extra_gauges:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for labels, value in samples:
+                lines.append(f'{name}{_labels(**labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _render_histogram(lines, name, help_text, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for (endpoint, method), histogram in sorted(histograms.items()):
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f'{name}_bucket{_labels(endpoint=endpoint, method=method, le=bound)} {count}')
+        lines.append(f'{name}_bucket{_labels(endpoint=endpoint, method=method, le="+Inf")} {histogram.total}')
+        lines.append(f'{name}_sum{_labels(endpoint=endpoint, method=method)} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{_labels(endpoint=endpoint, method=method)} {histogram.total}')
+
+
+# The start time lives on the statement's execution context, not the pooled
+# connection: a statement that raises never reaches after_cursor_execute and
+# must not leave anything behind for the next one
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_start', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if not has_request_context() or 'sql_count' not in g:
+        return
+    g.sql_count += 1
+    g.sql_seconds += elapsed
+    if len(g.sql_statements) < MAX_LOGGED_STATEMENTS:
+        g.sql_statements.append((elapsed, statement))
+
+
+def instrument_sql(engine):
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _extra_gauges(app):
+    from app.utils.db_pool import pool_stats
+    from app.utils.cache import get_cache
+
+    pools = pool_stats(app)
+    gauges = []
+    for key in ('checked_out', 'checked_in', 'overflow', 'timeouts', 'invalidations', 'wait_seconds_total'):
+        samples = [({'bind': bind}, stats[key]) for bind, stats in pools.items() if key in stats]
+        gauges.append((f'db_pool_{key}', f'Connection pool {key.replace("_", " ")}.', samples))
+
+    replicas = app.extensions.get('replicas')
+    if replicas is not None:
+        # -1: unreachable or not checked yet (reads go to the primary)
+        gauges.append(('db_replica_lag_seconds', 'How far each read replica is behind the primary.',
+                       [({'bind': key}, -1 if lag is None else round(lag, 3)) for key, lag in replicas.lag.items()]))
+
+    startup = app.extensions.get('startup', {})
+    gauges.append(('app_startup_seconds', 'Time spent importing and creating the app.',
+                   [({'phase': phase.replace('_seconds', '')}, round(seconds, 6)) for phase, seconds in startup.items()]))
+
+    cache = get_cache().stats()
+    for key in ('hits', 'misses', 'evictions'):
+        if key in cache:
+            gauges.append((f'entity_cache_{key}', f'Entity cache {key}.', [({}, cache[key])]))
+    return gauges
+
+
+def init_metrics(app, db):
+    registry = MetricsRegistry()
+    app.extensions['metrics'] = registry
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_sql(engine)
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_start = time.perf_counter()
+        g.request_recorded = False
+        g.sql_count = 0
+        g.sql_seconds = 0.0
+        g.sql_statements = []
+
+    def record(status):
+        if 'request_start' not in g or g.get('request_recorded'):
+            return
+        g.request_recorded = True
+        elapsed = time.perf_counter() - g.request_start
+        # Route templates, not raw paths, keep the label set bounded
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        registry.record(endpoint, request.method, status, elapsed, g.sql_count, g.sql_seconds)
+
+        slow_ms = app.config.get('SLOW_REQUEST_MS')
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            statements = '\n'.join(f'  [{t * 1000:.1f}ms] {s[:500]}' for t, s in g.sql_statements)
+            logger.warning('Slow request %s %s -> %s in %.1fms (%d SQL statements, %.1fms in SQL)\n%s',
+                           request.method, request.path, status, elapsed * 1000,
+                           g.sql_count, g.sql_seconds * 1000, statements)
+
+    @app.after_request
+    def record_request_metrics(response):
+        record(response.status_code)
+        return response
+
+    @app.teardown_request
+    def record_failed_request(exc):
+        # An exception that escaped every handler, or an after_request hook
+        # that failed, never produced a response: count it as the 500 it is
+        record(500)
+
+    @app.route('/metrics')
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return jsonify({"message": "Forbidden"}), 403
+        body = registry.render(_extra_gauges(app))
+        return app.response_class(body, mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,117 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Message
+from app import db, mail
+from app.models.outbox import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 8
+# How long a claimed row stays hidden from other workers while it is sent
+DEFAULT_CLAIM_SECONDS = 300
+# Retry delay doubles after every failure: 30s, 1m, 2m, 4m ... capped at 1h
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def backoff_delay(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def _record_failure(email, error, max_attempts, now):
+    # The attempt was already counted when the row was claimed
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'dead'
+        logger.error('Outbox email %s dead-lettered after %s attempts: %s', email.id, email.attempts, error)
+    else:
+        email.next_attempt_at = now + backoff_delay(email.attempts)
+
+
+def claim_batch(batch_size, claim_seconds):
+    """Claim due pending emails and commit the claim.
+
+    Each claimed row counts an attempt and is hidden from other workers for
+    ``claim_seconds``; a worker that dies mid-batch leaves its rows to be
+    retried once that runs out. Returns ``(id, Message)`` pairs, built before
+    the commit so sending them needs no database access.
+    """
+    now = datetime.utcnow()
+    batch = (OutboxEmail.query
+             .filter(OutboxEmail.status == 'pending', OutboxEmail.next_attempt_at <= now)
+             .order_by(OutboxEmail.id)
+             .limit(batch_size)
+             .with_for_update(skip_locked=True)
+             .all())
+
+    claimed = []
+    for email in batch:
+        email.attempts += 1
+        email.next_attempt_at = now + timedelta(seconds=claim_seconds)
+        claimed.append((email.id, Message(email.subject, sender=email.sender, recipients=email.recipients, body=email.body)))
+    db.session.commit()
+    return claimed
+
+
+def drain_outbox(batch_size=None, max_attempts=None, claim_seconds=None):
+    """Send one batch of due outbox emails over a single SMTP connection.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED in a short transaction, so
+    several workers can drain the same table; no row lock or transaction is
+    held while talking to the SMTP server. Returns the number of emails sent.
+    """
+    config = current_app.config
+    batch_size = batch_size or config.get('MAIL_OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    max_attempts = max_attempts or config.get('MAIL_OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    claim_seconds = claim_seconds or config.get('MAIL_OUTBOX_CLAIM_SECONDS', DEFAULT_CLAIM_SECONDS)
+
+    claimed = claim_batch(batch_size, claim_seconds)
+    if not claimed:
+        return 0
+
+    sent_at = {}
+    errors = {}
+    try:
+        with mail.connect() as connection:
+            for email_id, msg in claimed:
+                try:
+                    connection.send(msg)
+                except Exception as e:
+                    errors[email_id] = e
+                    continue
+                sent_at[email_id] = datetime.utcnow()
+    except Exception as e:
+        # Could not open the SMTP connection (or it dropped mid-batch): every
+        # row that was not attempted yet counts as a failed attempt
+        for email_id, _ in claimed:
+            if email_id not in sent_at:
+                errors.setdefault(email_id, e)
+
+    now = datetime.utcnow()
+    for email in OutboxEmail.query.filter(OutboxEmail.id.in_([email_id for email_id, _ in claimed])):
+        if email.id in sent_at:
+            email.status = 'sent'
+            email.sent_at = sent_at[email.id]
+        else:
+            _record_failure(email, errors[email.id], max_attempts, now)
+    db.session.commit()
+    return len(sent_at)
+
+
+def run_worker(poll_interval=5.0, once=False):
+    while True:
+        try:
+            sent = drain_outbox()
+        except Exception:
+            db.session.rollback()
+            logger.exception('Outbox worker iteration failed')
+            sent = 0
+
+        if once:
+            return sent
+        # Keep draining while there is a backlog, otherwise wait for new rows
+        if not sent:
+            time.sleep(poll_interval)
@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def clamp_page_size(limit):
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(values):
+    # Datetimes are stored as ISO strings so the cursor survives the JSON round trip
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError
+        values = []
+        for column, value in zip(columns, payload):
+            if column.type.python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            else:
+                values.append(column.type.python_type(value))
+        return values
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_query(query, columns, cursor=None, limit=None):
+    """Narrow ``query`` to the page after ``cursor``, ordered by ``columns``
+    descending. One extra row is fetched to tell whether a next page exists.
+
+    The last column must be unique so the ordering is total.
+    """
+    limit = clamp_page_size(limit)
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(tuple_(*columns) < tuple_(*values))
+
+    return query.order_by(*[c.desc() for c in columns]).limit(limit + 1)
+
+
+def keyset_paginate(query, columns, cursor=None, limit=None, row_values=None):
+    """Return one page of ``query`` plus the cursor of the next page, or
+    ``None`` when this is the last page.
+
+    ``row_values`` extracts the key values from a row when they are not plain
+    attributes of it (e.g. a computed rank).
+    """
+    limit = clamp_page_size(limit)
+    rows = keyset_query(query, columns, cursor, limit).all()
+    return page_from_rows(rows, columns, limit, row_values)
+
+
+def page_from_rows(rows, columns, limit, row_values=None):
+    # Split the limit+1 rows fetched by keyset_query into the page and the
+    # next cursor; shared with callers that execute the query themselves
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = row_values(last) if row_values else [getattr(last, c.key) for c in columns]
+        next_cursor = encode_cursor(values)
+
+    return rows, next_cursor
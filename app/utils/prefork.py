@@ -0,0 +1,42 @@
+import os
+from sqlalchemy.orm import configure_mappers
+
+# Engines of the app whose pools a forked child drops
+_engines = []
+_fork_hook_registered = False
+
+
+def prepare_for_fork(app, db):
+    """Finish the work every worker would otherwise repeat, and make the
+    engines safe to inherit.
+
+    With ``gunicorn --preload`` the app is built once in the master and the
+    workers are forked from it. Mappers are configured here so workers start
+    with them done. Each engine's pool is dropped in the child after a fork,
+    so a worker never shares a socket the master (or a sibling) opened; the
+    inherited connections are left open for their owner, not closed.
+    """
+    global _fork_hook_registered
+    configure_mappers()
+
+    # The hook cannot be unregistered, so there is one per process and it
+    # disposes the engines of the app created last; an app built before it
+    # (tests, scripts) is not kept alive by it
+    with app.app_context():
+        _engines[:] = db.engines.values()
+    if not _fork_hook_registered:
+        os.register_at_fork(after_in_child=_dispose_inherited_pools)
+        _fork_hook_registered = True
+
+
+def _dispose_inherited_pools():
+    for engine in _engines:
+        engine.dispose(close=False)
+
+
+def warm_engines(app, db):
+    # One connection per engine, so a worker's first request skips the connect
+    with app.app_context():
+        for engine in db.engines.values():
+            with engine.connect():
+                pass
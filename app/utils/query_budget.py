@@ -0,0 +1,64 @@
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries):
+    """Declare the most SQL statements a view may issue.
+
+    Counts come from the per-request SQL accounting in app.utils.metrics.
+    QUERY_BUDGET_MODE decides what an overrun does: 'log' warns, 'raise'
+    fails the request (under app.testing the test client re-raises it, so
+    any test hitting the endpoint catches a new N+1), 'off' skips the check.
+    Streamed responses are not covered: their queries run after the view
+    returns.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            mode = current_app.config.get('QUERY_BUDGET_MODE', 'log')
+            start = g.get('sql_count')
+            if mode == 'off' or start is None:
+                return view(*args, **kwargs)
+
+            response = view(*args, **kwargs)
+            used = g.sql_count - start
+            if used > max_queries:
+                statements = '\n'.join(f'  {s[:500]}' for _, s in g.sql_statements)
+                message = f'{request.method} {request.path} issued {used} SQL statements, budget is {max_queries}'
+                if mode == 'raise':
+                    raise QueryBudgetExceeded(f'{message}\n{statements}')
+                logger.warning('%s\n%s', message, statements)
+            return response
+
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect the statements this thread runs on ``engine`` inside the
+    block, for scripts and tests that drive code outside a request.
+    Background threads (revocation sync, listeners) are not counted."""
+    statements = []
+    thread = threading.get_ident()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    event.listen(engine, 'after_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'after_cursor_execute', record)
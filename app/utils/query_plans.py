@@ -0,0 +1,88 @@
+import json
+import uuid
+from datetime import datetime
+from sqlalchemy import text
+from app.models.report import Report
+from app.models.user import User
+from app.utils.pagination import keyset_query, encode_cursor
+
+SEED_EMAIL_DOMAIN = 'seed.invalid'
+
+SEED_USERS_SQL = text("""
+    INSERT INTO users (id, name, dob, city, barangay_complainant, contact_num, email,
+                       is_active, password_hash, role, id_type, id_url, created_at, updated_at)
+    SELECT gen_random_uuid(), 'Seed User ' || g, DATE '1990-01-01', 'City ' || (g % 20),
+           'Brgy ' || (g % 50), '+639' || lpad(g::text, 9, '0'), 'seed' || g || '@' || :domain,
+           true, 'x', 'user', 'image', 'seed', now(), now()
+    FROM generate_series(1, :users) AS g
+    ON CONFLICT DO NOTHING
+""")
+
+SEED_REPORTS_SQL = text("""
+    WITH seed_users AS (
+        SELECT array_agg(id) AS ids FROM users WHERE email LIKE '%@' || :domain
+    )
+    INSERT INTO reports (reporter_name, reporter_id, city, description, complainant_brgy,
+                         incident_brgy, reporter_type, incident_type, location, status,
+                         created_at, updated_at, evidences)
+    SELECT 'Seed User', seed_users.ids[1 + g % array_length(seed_users.ids, 1)],
+           'City ' || (g % 20), 'Synthetic report ' || g, 'Brgy ' || (g % 50),
+           'Brgy ' || (g % 80),
+           (ARRAY['victim', 'witness'])[1 + g % 2]::reporter_types,
+           (ARRAY['Physical Abuse', 'Verbal Abuse', 'Sexual Harassment', 'Child Abuse'])[1 + g % 4]::incident_types,
+           'Location ' || g,
+           (ARRAY['unopened', 'viewed', 'pending', 'resolved'])[1 + g % 4]::report_status,
+           now() - (g || ' minutes')::interval, now(), '[]'::jsonb
+    FROM generate_series(1, :reports) AS g, seed_users
+""")
+
+
+def seed_synthetic_data(connection, users, reports):
+    connection.execute(SEED_USERS_SQL, {'users': users, 'domain': SEED_EMAIL_DOMAIN})
+    connection.execute(SEED_REPORTS_SQL, {'reports': reports, 'domain': SEED_EMAIL_DOMAIN})
+    # Fresh statistics, otherwise the planner still believes the tables are tiny
+    connection.execute(text('ANALYZE users'))
+    connection.execute(text('ANALYZE reports'))
+
+
+def _report_page(**filters):
+    return keyset_query(Report.filter_query(Report.query, filters), (Report.created_at, Report.id))
+
+
+# Queries issued by the API on every dashboard load. None of them may be
+# answered with a sequential scan over these tables once the data grows.
+HOT_QUERIES = {
+    'reports: first page': lambda: _report_page(),
+    'reports: next page': lambda: keyset_query(
+        Report.query, (Report.created_at, Report.id),
+        cursor=encode_cursor([datetime(2026, 1, 1), 1000])
+    ),
+    'reports: by status': lambda: _report_page(status='unopened'),
+    'reports: by incident_brgy': lambda: _report_page(incident_brgy='Brgy 7'),
+    'reports: by incident_type': lambda: _report_page(incident_type='Child Abuse'),
+    'reports: by reporter': lambda: Report.query.filter_by(reporter_id=str(uuid.uuid4())),
+    'reports: by id': lambda: Report.query.filter_by(id=1),
+    'users: login by email': lambda: User.query.filter_by(email='someone@example.com'),
+    'users: by contact_num': lambda: User.query.filter_by(contact_num='+639000000001'),
+}
+
+CHECKED_TABLES = {'reports', 'users'}
+
+
+def explain(connection, query):
+    # Parameters go to the driver untouched, so keep them driver-native types
+    compiled = query.statement.compile(dialect=connection.dialect)
+    result = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def find_seq_scans(plan, tables=CHECKED_TABLES):
+    found = []
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in tables:
+        found.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        found.extend(find_seq_scans(child, tables))
+    return found
@@ -0,0 +1,189 @@
+import logging
+import random
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+# Only these blueprints' GET/HEAD requests may read from a replica
+REPLICA_BLUEPRINTS = {'reports', 'user'}
+# Set after a write; the client reads from the primary until it runs out
+READ_YOUR_WRITES_COOKIE = 'db_read_primary_until'
+
+# Seconds the replica is behind the primary; 0 when it has replayed all it
+# received (an idle primary writes nothing, so the replay timestamp alone
+# would look like lag). Also 0 on a server that is not a replica at all.
+LAG_SQL = text("""
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END
+""")
+
+
+def replica_binds(uris):
+    # DATABASE_REPLICA_URIS (comma separated) -> SQLALCHEMY_BINDS entries
+    return {f'replica{i}': uri.strip() for i, uri in enumerate(uris.split(',')) if uri.strip()}
+
+
+def read_from_primary(view):
+    """Keep a read-only view on the primary, e.g. when it must not see data
+    older than something it got elsewhere. Goes below @jwt_required()."""
+    view.read_from_primary = True
+    return view
+
+
+class RoutingSession(Session):
+    """Session that sends the reads of a replica-routed request to the
+    replica picked for it. Flushes, DML statements and everything after the
+    request's first write go to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, 'is_dml', False) and has_request_context():
+            replica = replica_for_request()
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaMonitor:
+    """Tracks how far each replica is behind and who wrote recently.
+
+    A background thread measures the lag every ``check_interval`` seconds.
+    A replica more than ``max_lag`` seconds behind, unreachable, or not
+    checked yet gets no reads until it catches up.
+    """
+
+    def __init__(self, engines, max_lag=5, check_interval=2, read_your_writes=10):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.read_your_writes = read_your_writes
+        self.lag = {key: None for key in engines}
+        # identity -> time.monotonic() until which it reads from the primary
+        self._writers = {}
+        self._lock = threading.Lock()
+        self._checker = None
+
+    def pick(self):
+        self._start_checker()
+        healthy = [key for key, lag in self.lag.items() if lag is not None and lag <= self.max_lag]
+        return random.choice(healthy) if healthy else None
+
+    def wrote(self, identity):
+        with self._lock:
+            self._writers[identity] = time.monotonic() + self.read_your_writes
+
+    def wrote_recently(self, identity):
+        return self._writers.get(identity, 0) > time.monotonic()
+
+    def check(self):
+        for key, engine in self.engines.items():
+            try:
+                with engine.connect() as connection:
+                    self.lag[key] = float(connection.execute(LAG_SQL).scalar())
+            except Exception as e:
+                if self.lag[key] is not None:
+                    logger.warning('Replica %s unavailable, reading from the primary: %s', key, e)
+                self.lag[key] = None
+
+        now = time.monotonic()
+        with self._lock:
+            self._writers = {identity: until for identity, until in self._writers.items() if until > now}
+
+    def _start_checker(self):
+        if self._checker is not None and self._checker.is_alive():
+            return
+        with self._lock:
+            if self._checker is None or not self._checker.is_alive():
+                # Started on first use, so it runs in the worker, never in a
+                # pre-fork master. Until its first check reads use the primary
+                self._checker = threading.Thread(target=self._run, name='replica-lag-check', daemon=True)
+                self._checker.start()
+
+    def _run(self):
+        while True:
+            self.check()
+            time.sleep(self.check_interval)
+
+
+def _identity():
+    try:
+        return get_jwt().get('sub')
+    except RuntimeError:
+        return None
+
+
+def replica_for_request():
+    # Decided on the request's first query, once @jwt_required() has run
+    # and the caller is known
+    if 'db_replica' not in g:
+        g.db_replica = None
+        monitor = current_app.extensions.get('replicas')
+        if monitor is not None and g.get('db_route_reads') and not g.get('db_wrote'):
+            recent_write = request.cookies.get(READ_YOUR_WRITES_COOKIE, type=float, default=0) > time.time()
+            if not recent_write and not monitor.wrote_recently(_identity()):
+                g.db_replica = monitor.pick()
+    return g.db_replica
+
+
+def _pin_to_primary():
+    # The rest of this request, and the client's next few, read what it wrote
+    if has_request_context():
+        g.db_wrote = True
+        g.db_replica = None
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _pin_after_flush(session, flush_context):
+    _pin_to_primary()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _pin_after_dml(orm_execute_state):
+    # Core INSERT/UPDATE/DELETE through session.execute() (bulk transitions,
+    # claims, ingestion) never flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _pin_to_primary()
+
+
+def init_replica_routing(app, db):
+    binds = app.config.get('SQLALCHEMY_BINDS') or {}
+    replica_keys = [key for key in binds if key.startswith('replica')]
+    if not replica_keys:
+        return
+
+    with app.app_context():
+        engines = {key: db.engines[key] for key in replica_keys}
+    monitor = ReplicaMonitor(
+        engines,
+        max_lag=app.config['REPLICA_MAX_LAG_SECONDS'],
+        check_interval=app.config['REPLICA_LAG_CHECK_SECONDS'],
+        read_your_writes=app.config['READ_YOUR_WRITES_SECONDS']
+    )
+    app.extensions['replicas'] = monitor
+
+    @app.before_request
+    def _route_reads():
+        view = app.view_functions.get(request.endpoint)
+        g.db_route_reads = (
+            request.method in ('GET', 'HEAD')
+            and request.blueprint in REPLICA_BLUEPRINTS
+            and not getattr(view, 'read_from_primary', False)
+        )
+
+    @app.after_request
+    def _remember_writes(response):
+        if g.get('db_wrote'):
+            identity = _identity()
+            if identity is not None:
+                monitor.wrote(identity)
+            # For the other workers, which never saw the write
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE, str(time.time() + monitor.read_your_writes),
+                max_age=int(monitor.read_your_writes) + 1, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,308 @@
+import json
+import logging
+import select
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import Text, cast, event, func, inspect, insert
+from sqlalchemy.orm import Session
+from app import db
+from app.models.report import Report
+from app.models.report_event import ReportEvent
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'report_events'
+# How long EventSource clients wait before reconnecting
+RETRY_MS = 3000
+LISTEN_POLL_SECONDS = 5
+LISTEN_RETRY_SECONDS = 1
+LISTEN_READY_TIMEOUT = 5
+# Enough for a dashboard to place a new report; details come from GET /reports/<id>
+CREATED_FIELDS = ('status', 'incident_type', 'incident_brgy', 'city', 'reporter_type')
+# Transaction-level advisory lock serialising event writers (see below)
+EVENTS_LOCK_KEY = 0x5245564e
+
+_broker_lock = threading.Lock()
+
+
+def record_report_events(session, events):
+    """Log ``(type, report_id, data)`` events in the session's transaction.
+
+    On Postgres the same statement NOTIFYs the listeners, which hear about
+    the events only if and when the transaction commits. Elsewhere they are
+    handed to this process's streams after the commit.
+
+    ORM changes are recorded by the flush listener below; bulk statements
+    that bypass the flush call this themselves.
+
+    Clients resume from the last event id they saw, so ids must become
+    visible in id order. A sequence alone hands them out in insert order,
+    and a transaction that inserted later can commit first: a client could
+    see id N+1 live, reconnect with it and never get N. Writers therefore
+    take an advisory lock held until their transaction ends, which makes
+    insert order and commit order the same. Event writes are serialised
+    for the rest of each writing transaction, so commit soon after writing.
+    """
+    if not events:
+        return
+
+    table = ReportEvent.__table__
+    inserted = insert(table).values(
+        [{'type': type_, 'report_id': report_id, 'data': data} for type_, report_id, data in events]
+    ).returning(table.c.id, table.c.type, table.c.report_id, table.c.data, table.c.created_at)
+
+    connection = session.connection()
+    if connection.dialect.name == 'postgresql':
+        connection.execute(db.select(func.pg_advisory_xact_lock(EVENTS_LOCK_KEY)))
+        inserted = inserted.cte('inserted')
+        payload = func.json_build_object(
+            'id', inserted.c.id, 'type', inserted.c.type, 'report_id', inserted.c.report_id,
+            'data', inserted.c.data, 'created_at', inserted.c.created_at
+        )
+        connection.execute(db.select(func.pg_notify(CHANNEL, cast(payload, Text))).select_from(inserted))
+    else:
+        rows = connection.execute(inserted).mappings().all()
+        session.info.setdefault('report_events', []).extend(dict(row) for row in rows)
+
+
+def status_changed_event(report_id, old_status, status):
+    return ('report.status_changed', report_id, {'status': status, 'from': old_status})
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_report_changes(session, flush_context):
+    # Attribute history still holds the pre-flush values here
+    events = []
+    for obj in session.new:
+        if isinstance(obj, Report):
+            events.append(('report.created', obj.id, {field: getattr(obj, field) for field in CREATED_FIELDS}))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Report) or obj in session.deleted:
+            continue
+        history = inspect(obj).attrs.status.history
+        if history.deleted and history.added:
+            events.append(status_changed_event(obj.id, history.deleted[0], obj.status))
+
+    record_report_events(session, events)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_local_events(session):
+    events = session.info.pop('report_events', None)
+    if events:
+        get_event_broker().publish_all(events)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_local_events(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('report_events', None)
+
+
+class Subscription:
+    """Events waiting to be written to one stream.
+
+    At most ``max_pending`` are held. A client that falls further behind is
+    cut off and replays from the table when it reconnects, so a slow reader
+    costs a reconnect instead of server memory.
+    """
+
+    def __init__(self, max_pending):
+        self.max_pending = max_pending
+        self.overflowed = False
+        self._events = deque()
+        self._cond = threading.Condition()
+
+    def put(self, event):
+        with self._cond:
+            if self.overflowed:
+                return
+            if len(self._events) >= self.max_pending:
+                self.drop()
+                return
+            self._events.append(event)
+            self._cond.notify()
+
+    def drop(self):
+        with self._cond:
+            self.overflowed = True
+            self._events.clear()
+            self._cond.notify()
+
+    def get(self, timeout):
+        """Wait up to ``timeout`` seconds for events. Returns them ([] if none
+        came), or None once the subscription was cut off."""
+        with self._cond:
+            if not self._events and not self.overflowed:
+                self._cond.wait(timeout)
+            if self.overflowed:
+                return None
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+
+class ReportEventBroker:
+    """Fans report events out to this process's open streams.
+
+    With an ``engine`` a background thread LISTENs on Postgres and every
+    worker hears every commit. Without one, events are published in-process
+    after commit, which is enough for a single process (and tests).
+    """
+
+    def __init__(self, engine=None, max_pending=100):
+        self.engine = engine
+        self.max_pending = max_pending
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._listening = threading.Event()
+
+    def subscribe(self):
+        if self.engine is not None:
+            self._start_listener()
+        subscription = Subscription(self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish_all(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            for event in events:
+                subscription.put(event)
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                # Started on first use, so it runs in the worker, never in a
+                # pre-fork master
+                self._listener = threading.Thread(target=self._listen, name='report-events-listener', daemon=True)
+                self._listener.start()
+        # A stream that subscribed before LISTEN took effect would miss events
+        self._listening.wait(LISTEN_READY_TIMEOUT)
+
+    def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                # Kept out of the pool: it sits in LISTEN for the life of the worker
+                connection.detach()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+
+                if self._listening.is_set():
+                    # Whatever was sent while the listener was down is lost:
+                    # make every stream reconnect and replay it from the table
+                    with self._lock:
+                        subscribers = list(self._subscribers)
+                    for subscription in subscribers:
+                        subscription.drop()
+                self._listening.set()
+
+                while True:
+                    if select.select([dbapi_connection], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    events = [json.loads(notify.payload) for notify in dbapi_connection.notifies]
+                    dbapi_connection.notifies.clear()
+                    self.publish_all(events)
+            except Exception:
+                logger.exception('Report event listener failed, reconnecting')
+                time.sleep(LISTEN_RETRY_SECONDS)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+def get_event_broker():
+    broker = current_app.extensions.get('report_events')
+    if broker is None:
+        with _broker_lock:
+            broker = current_app.extensions.get('report_events')
+            if broker is None:
+                engine = db.engine if db.engine.dialect.name == 'postgresql' else None
+                broker = ReportEventBroker(engine, current_app.config['REPORT_STREAM_MAX_PENDING'])
+                current_app.extensions['report_events'] = broker
+    return broker
+
+
+def replay_events(last_event_id, limit):
+    """Events after ``last_event_id``, oldest first, or None when that is no
+    longer possible (pruned already, or more than ``limit`` of them)."""
+    oldest = db.session.query(func.min(ReportEvent.id)).scalar()
+    if oldest is not None and last_event_id < oldest - 1:
+        return None
+    events = ReportEvent.query.filter(ReportEvent.id > last_event_id).order_by(ReportEvent.id).limit(limit + 1).all()
+    if len(events) > limit:
+        return None
+    return [event.to_dict() for event in events]
+
+
+def format_event(event):
+    data = {"report_id": str(event['report_id']), **event['data'], "at": event['created_at']}
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {current_app.json.dumps(data)}\n\n"
+
+
+def iter_report_events(last_event_id=None):
+    """Server-Sent Events for GET /reports/stream.
+
+    Subscribes first, then replays what the client missed since
+    ``last_event_id``, then streams live events with a keep-alive comment
+    whenever nothing happened for a while.
+    """
+    config = current_app.config
+    broker = get_event_broker()
+    subscription = broker.subscribe()
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+
+        if last_event_id is not None:
+            events = replay_events(last_event_id, config['REPORT_STREAM_REPLAY_LIMIT'])
+            if events is None:
+                # Too far behind to catch up event by event: the client
+                # reloads its list and continues from the newest event
+                newest = db.session.query(func.max(ReportEvent.id)).scalar() or 0
+                reset = {"message": "Missed events are no longer available. Reload the reports."}
+                yield f'id: {newest}\nevent: reset\ndata: {current_app.json.dumps(reset)}\n\n'
+                last_event_id = newest
+            else:
+                for event in events:
+                    yield format_event(event)
+                    last_event_id = event['id']
+
+        # Nothing else here touches the database; don't hold a pooled
+        # connection for the life of the stream
+        db.session.close()
+
+        while True:
+            events = subscription.get(config['REPORT_STREAM_HEARTBEAT_SECONDS'])
+            if events is None:
+                return
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                # Already sent by the replay
+                if last_event_id is None or event['id'] > last_event_id:
+                    yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def prune_report_events(older_than):
+    deleted = ReportEvent.query.filter(ReportEvent.created_at < datetime.utcnow() - older_than).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
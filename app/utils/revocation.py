@@ -0,0 +1,157 @@
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, or_, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models.token_revocation import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+# Rows are re-read for this long after the newest one seen, so a revocation
+# whose transaction committed late (after a newer row was synced) still arrives
+SYNC_OVERLAP = timedelta(seconds=60)
+PRUNE_INTERVAL_SECONDS = 60
+READY_TIMEOUT = 10
+
+_revocations_lock = threading.Lock()
+
+
+def _epoch(value):
+    return calendar.timegm(value.utctimetuple()) if value is not None else None
+
+
+class RevocationList:
+    """Every unexpired revocation, held in memory by each worker.
+
+    A background thread loads the table once, then every ``sync_interval``
+    seconds fetches only the rows added since. Checking a token is two dict
+    lookups; a revocation made in another worker takes effect here within
+    ``sync_interval`` seconds, one made in this worker right after its commit.
+    """
+
+    def __init__(self, engine, sync_interval=2):
+        self.engine = engine
+        self.sync_interval = sync_interval
+        # jti -> expiry (epoch seconds or None)
+        self._tokens = {}
+        # user id -> (not before, expiry)
+        self._users = {}
+        self._cursor = None
+        self._last_prune = time.monotonic()
+        self._lock = threading.Lock()
+        self._syncer = None
+        self._ready = threading.Event()
+
+    def is_revoked(self, payload):
+        self._start_syncer()
+        if payload.get('jti') in self._tokens:
+            return True
+        revoked_user = self._users.get(payload.get('sub'))
+        return revoked_user is not None and payload.get('iat', 0) < revoked_user[0]
+
+    def start(self):
+        """Load the list now rather than in the first request that checks a
+        token. Raises RuntimeError if the first load fails."""
+        self._start_syncer()
+
+    def apply(self, rows):
+        with self._lock:
+            for row in rows:
+                expires_at = _epoch(row['expires_at'])
+                if row['jti'] is not None:
+                    self._tokens[row['jti']] = expires_at
+                if row['user_id'] is not None:
+                    user_id = str(row['user_id'])
+                    current = self._users.get(user_id)
+                    if current is None or _epoch(row['not_before']) >= current[0]:
+                        self._users[user_id] = (_epoch(row['not_before']), expires_at)
+                if row.get('created_at') is not None and (self._cursor is None or row['created_at'] > self._cursor):
+                    self._cursor = row['created_at']
+
+    def sync(self):
+        table = TokenRevocation.__table__
+        query = select(table).where(or_(table.c.expires_at.is_(None), table.c.expires_at > datetime.utcnow()))
+        if self._cursor is not None:
+            query = query.where(table.c.created_at >= self._cursor - SYNC_OVERLAP)
+        with self.engine.connect() as connection:
+            rows = connection.execute(query).mappings().all()
+        self.apply(rows)
+
+        if time.monotonic() - self._last_prune > PRUNE_INTERVAL_SECONDS:
+            self._prune()
+
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp is None or exp > now}
+            self._users = {user_id: entry for user_id, entry in self._users.items() if entry[1] is None or entry[1] > now}
+            self._last_prune = time.monotonic()
+
+    def _start_syncer(self):
+        if self._ready.is_set():
+            return
+        with self._lock:
+            if self._syncer is None or not self._syncer.is_alive():
+                # Started on first use, so it runs in the worker, never in a
+                # pre-fork master
+                self._syncer = threading.Thread(target=self._run, name='token-revocation-sync', daemon=True)
+                self._syncer.start()
+        # Until the first load no token can be trusted
+        if not self._ready.wait(READY_TIMEOUT):
+            raise RuntimeError('Token revocations could not be loaded')
+
+    def _run(self):
+        while True:
+            try:
+                self.sync()
+                self._ready.set()
+            except Exception:
+                logger.exception('Syncing token revocations failed')
+            time.sleep(self.sync_interval)
+
+
+def init_revocation(app, jwt):
+    @jwt.token_in_blocklist_loader
+    def is_token_revoked(jwt_header, jwt_payload):
+        return get_revocation_list().is_revoked(jwt_payload)
+
+
+
+def get_revocation_list():
+    revocations = current_app.extensions.get('token_revocations')
+    if revocations is None:
+        with _revocations_lock:
+            revocations = current_app.extensions.get('token_revocations')
+            if revocations is None:
+                revocations = RevocationList(db.engine, current_app.config['TOKEN_REVOCATION_SYNC_SECONDS'])
+                current_app.extensions['token_revocations'] = revocations
+    return revocations
+
+
+# Revocations committed by this worker apply here at once instead of on the
+# next sync
+@event.listens_for(Session, 'after_flush')
+def _collect_revocations(session, flush_context):
+    rows = [obj for obj in session.new if isinstance(obj, TokenRevocation)]
+    if rows:
+        session.info.setdefault('token_revocations', []).extend(
+            {'jti': obj.jti, 'user_id': obj.user_id, 'not_before': obj.not_before, 'expires_at': obj.expires_at}
+            for obj in rows
+        )
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_revocations(session):
+    rows = session.info.pop('token_revocations', None)
+    if rows:
+        get_revocation_list().apply(rows)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_revocations(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('token_revocations', None)
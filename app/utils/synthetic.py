@@ -0,0 +1,168 @@
+import itertools
+import random
+import uuid
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, insert, select
+from app import db
+from app.models.report import Report
+from app.models.report_stat import ReportStat
+from app.models.user import User
+from app.utils.hashing import hash_password
+from app.utils.query_plans import SEED_EMAIL_DOMAIN
+
+# Every generated account shares this prefix, so a rerun can clean up after itself
+BENCH_EMAIL_PREFIX = 'bench-'
+DEFAULT_PASSWORD = 'Bench123!'
+INSERT_CHUNK_SIZE = 5000
+
+CITIES = {
+    'Quezon City': 0.30, 'Manila': 0.22, 'Caloocan': 0.14, 'Pasig': 0.10,
+    'Taguig': 0.09, 'Makati': 0.08, 'Marikina': 0.07,
+}
+BARANGAY_COUNT = 40
+
+INCIDENT_TYPES = {'Physical Abuse': 0.35, 'Verbal Abuse': 0.30, 'Child Abuse': 0.20, 'Sexual Harassment': 0.15}
+REPORTER_TYPES = {'victim': 0.7, 'witness': 0.3}
+
+# Status mix by report age in days: new reports are mostly untouched, old
+# ones mostly resolved
+STATUS_BY_AGE = [
+    (7, {'unopened': 0.5, 'viewed': 0.3, 'pending': 0.2, 'resolved': 0.0}),
+    (60, {'unopened': 0.1, 'viewed': 0.2, 'pending': 0.4, 'resolved': 0.3}),
+    (None, {'unopened': 0.0, 'viewed': 0.05, 'pending': 0.15, 'resolved': 0.8}),
+]
+
+WORDS = [
+    'sinuntok', 'sinampal', 'pinagmumura', 'sinigawan', 'hinipuan', 'pinagbantaan', 'tinulak',
+    'punched', 'slapped', 'threatened', 'shouted', 'groped', 'kicked', 'followed', 'asawa',
+    'kapitbahay', 'boyfriend', 'husband', 'neighbor', 'employer', 'bahay', 'kalsada', 'palengke',
+    'house', 'market', 'school', 'gabi', 'night', 'lasing', 'drunk', 'anak', 'child', 'repeatedly',
+]
+STREETS = ['Rizal St.', 'Mabini St.', 'Bonifacio Ave.', 'Luna St.', 'Aguinaldo Hwy.', 'Del Pilar St.']
+
+
+def _pick(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _barangay(rng):
+    # Zipf-like: a handful of barangays account for most reports
+    rank = min(int(rng.paretovariate(1.2)), BARANGAY_COUNT)
+    return f'Brgy {rank}'
+
+
+def _status(rng, age_days):
+    for limit, weights in STATUS_BY_AGE:
+        if limit is None or age_days < limit:
+            return _pick(rng, weights)
+
+
+def _chunks(rows, size=INSERT_CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def delete_synthetic_data():
+    # Removes the bench accounts and every report filed by them, including
+    # ones the create-report benchmark added; other reports are untouched
+    bench_users = select(User.id).where(User.email.like(f'{BENCH_EMAIL_PREFIX}%@{SEED_EMAIL_DOMAIN}'))
+    reports = db.session.execute(delete(Report).where(Report.reporter_id.in_(bench_users))).rowcount
+    users = db.session.execute(delete(User).where(User.id.in_(bench_users))).rowcount
+    db.session.commit()
+    if reports:
+        ReportStat.rebuild()
+    return users, reports
+
+
+def _next_numbers():
+    # Numbers after the highest existing bench account of each role and
+    # contact number, so a rerun without --reset adds accounts instead of
+    # colliding with the ones already there
+    def highest(role):
+        number = db.cast(db.func.substring(User.email, f'^{BENCH_EMAIL_PREFIX}{role}([0-9]+)@'), db.Integer)
+        return db.session.query(db.func.max(number)).filter(
+            User.email.like(f'{BENCH_EMAIL_PREFIX}{role}%@{SEED_EMAIL_DOMAIN}')
+        ).scalar()
+
+    contact_num = db.session.query(db.func.max(User.contact_num)).filter(User.contact_num.like('+6399%')).scalar()
+    return {
+        'user': (highest('user') or -1) + 1,
+        'agent': (highest('agent') or -1) + 1,
+        'contact': int(contact_num[5:]) + 1 if contact_num else 0
+    }
+
+
+def generate_synthetic_data(users, reports, agents=None, days=365, password=DEFAULT_PASSWORD, seed=None):
+    """Bulk-load ``users`` accounts and ``reports`` reports with skewed,
+    realistic-looking distributions, then rebuild the report stats.
+
+    Accounts are ``bench-user<N>@seed.invalid`` / ``bench-agent<N>@seed.invalid``,
+    all active, all sharing ``password`` (hashed once). Numbering continues
+    after any bench accounts already present. Returns the counts.
+    """
+    rng = random.Random(seed)
+    agents = max(1, users // 100) if agents is None else agents
+    password_hash = hash_password(password)
+    now = datetime.utcnow()
+    start = _next_numbers()
+
+    user_rows = []
+    for i in range(users + agents):
+        role = 'agent' if i >= users else 'user'
+        number = start[role] + (i - users if role == 'agent' else i)
+        user_rows.append({
+            'id': uuid.uuid4(),
+            'name': f'Bench {role.title()} {number}',
+            'dob': date(1960, 1, 1) + timedelta(days=rng.randrange(16000)),
+            'city': _pick(rng, CITIES),
+            'barangay_complainant': _barangay(rng),
+            # +6399 keeps these clear of the query-plan seed numbers
+            'contact_num': f'+6399{start["contact"] + i:08d}',
+            'email': f'{BENCH_EMAIL_PREFIX}{role}{number}@{SEED_EMAIL_DOMAIN}',
+            'is_active': True,
+            'password_hash': password_hash,
+            'role': role,
+            'id_type': 'image',
+            'id_url': 'synthetic',
+            'created_at': now - timedelta(days=days),
+            'updated_at': now - timedelta(days=days),
+        })
+    for chunk in _chunks(user_rows):
+        db.session.execute(insert(User), chunk)
+        db.session.commit()
+
+    # A few users file many reports, most file one or two
+    reporters = [row for row in user_rows if row['role'] == 'user']
+    reporter_weights = list(itertools.accumulate(rng.paretovariate(1.5) for _ in reporters))
+
+    report_rows = []
+    for i in range(reports if reporters else 0):
+        reporter = rng.choices(reporters, cum_weights=reporter_weights)[0]
+        age = timedelta(seconds=rng.randrange(days * 86400))
+        city = _pick(rng, CITIES)
+        report_rows.append({
+            'reporter_name': reporter['name'],
+            'reporter_id': reporter['id'],
+            'city': city,
+            'description': ' '.join(rng.choices(WORDS, k=rng.randint(8, 40))),
+            'complainant_brgy': reporter['barangay_complainant'],
+            'incident_brgy': _barangay(rng),
+            'reporter_type': _pick(rng, REPORTER_TYPES),
+            'incident_type': _pick(rng, INCIDENT_TYPES),
+            'location': f'{rng.randint(1, 999)} {rng.choice(STREETS)}, {city}',
+            'status': _status(rng, age.days),
+            'evidences': [],
+            'created_at': now - age,
+            'updated_at': now - age,
+        })
+        if len(report_rows) >= INSERT_CHUNK_SIZE:
+            db.session.execute(insert(Report), report_rows)
+            db.session.commit()
+            report_rows = []
+    if report_rows:
+        db.session.execute(insert(Report), report_rows)
+        db.session.commit()
+
+    # Bulk inserts skip the flush hooks that keep the counters current
+    ReportStat.rebuild()
+    return {'users': users, 'agents': agents, 'reports': reports if reporters else 0}
@@ -0,0 +1,70 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select, update
+from app import db
+from app.models.report import Report
+from app.models.report_stat import ReportStat
+from app.utils.cache import invalidate_on_commit
+from app.utils.report_events import record_report_events, status_changed_event
+
+MAX_BULK_TRANSITION = 1000
+
+
+def bulk_transition(status, ids=None, filters=None):
+    """Move reports to ``status`` with a single UPDATE ... RETURNING.
+
+    ``ids`` or ``filters`` (the GET /reports filter arguments) picks the
+    reports. Only those whose current status may move to ``status`` change;
+    for ``ids`` every id gets a result saying what happened to it. A filter
+    changes at most MAX_BULK_TRANSITION reports per call.
+
+    The caller commits. The statement bypasses the ORM, so the status
+    counters, the cache invalidation and the report events are handled here.
+    """
+    reports = Report.__table__
+    candidates = select(reports.c.id, reports.c.status.label('old_status')).where(
+        reports.c.status.in_(Report.transition_sources(status))
+    )
+    if ids is not None:
+        candidates = candidates.where(reports.c.id.in_(ids))
+    else:
+        candidates = Report.filter_query(candidates, filters)
+    candidates = candidates.order_by(reports.c.id).limit(MAX_BULK_TRANSITION).subquery()
+
+    # Re-checking the old status makes a report changed concurrently (after
+    # the subquery's snapshot) drop out instead of being moved from a stale state
+    stmt = (
+        update(reports)
+        .where(reports.c.id == candidates.c.id, reports.c.status == candidates.c.old_status)
+        .values(status=status, updated_at=datetime.utcnow())
+        .returning(reports.c.id, candidates.c.old_status)
+    )
+    moved = dict(db.session.execute(stmt).all())
+
+    deltas = Counter()
+    for old_status in moved.values():
+        deltas[('status', old_status)] -= 1
+        deltas[('status', status)] += 1
+    ReportStat.apply_deltas(db.session.connection(), deltas)
+    invalidate_on_commit(db.session, 'report', *moved)
+    record_report_events(db.session, [status_changed_event(id, old, status) for id, old in sorted(moved.items())])
+
+    if ids is None:
+        results = [{"id": str(id), "result": "updated", "from": old} for id, old in sorted(moved.items())]
+        return {"status": status, "updated": len(moved), "more": len(moved) == MAX_BULK_TRANSITION, "results": results}
+
+    # Explain the ids that did not move with one lookup
+    missing = [id for id in ids if id not in moved]
+    current = dict(db.session.execute(select(reports.c.id, reports.c.status).where(reports.c.id.in_(missing))).all()) if missing else {}
+
+    results = []
+    for id in ids:
+        if id in moved:
+            results.append({"id": str(id), "result": "updated", "from": moved[id]})
+        elif id not in current:
+            results.append({"id": str(id), "result": "not_found"})
+        elif current[id] == status:
+            results.append({"id": str(id), "result": "unchanged"})
+        else:
+            results.append({"id": str(id), "result": "invalid_transition", "current": current[id]})
+    return {"status": status, "updated": len(moved), "results": results}
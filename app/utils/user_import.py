@@ -0,0 +1,151 @@
+import csv
+import uuid
+from datetime import date, datetime
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from app.models.user import User
+from app.utils.hashing import hash_passwords
+from app.utils.validation import check_column_values
+
+DEFAULT_CHUNK_SIZE = 500
+
+REQUIRED_FIELDS = ['name', 'dob', 'city', 'barangay_complainant', 'contact_num', 'email', 'password', 'id_url']
+OPTIONAL_FIELDS = ['role', 'id_type']
+
+
+def iter_csv_rows(lines):
+    """Yield ``(row_number, record)`` for every CSV data row; the first line
+    holds the column names. Empty cells count as missing."""
+    for row, record in enumerate(csv.DictReader(lines), start=1):
+        yield row, {key: value for key, value in record.items() if key is not None and value not in (None, '')}
+
+
+def _validate(record):
+    """Check a record with the User model's own validators and return an
+    unsaved User carrying the plaintext password to hash."""
+    if isinstance(record, ValueError):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Each row must be a JSON object.")
+
+    for field in REQUIRED_FIELDS:
+        if not record.get(field):
+            raise ValueError(f"The field '{field}' is mandatory.")
+    for field in record:
+        if field not in REQUIRED_FIELDS + OPTIONAL_FIELDS:
+            raise ValueError(f"The field '{field}' is not allowed.")
+
+    # What Postgres (or the validators below, with a TypeError) would reject
+    # and take the whole run down with
+    check_column_values(User.__table__, record)
+    if not isinstance(record['password'], str):
+        raise ValueError("The field 'password' must be a string.")
+
+    data = dict(record)
+    password = data.pop('password')
+    try:
+        data['dob'] = date.fromisoformat(str(data['dob']))
+    except ValueError:
+        raise ValueError("The field 'dob' must be an ISO 8601 date.")
+
+    # The @validates hooks (email, contact number) run on construction
+    user = User(id=uuid.uuid4(), is_active=False, role=data.pop('role', 'user'), id_type=data.pop('id_type', 'image'), **data)
+    user.validate_password('password', password)
+    return user, password
+
+
+def _duplicate_reasons(users):
+    # Only for rows ON CONFLICT skipped: say which unique value was taken
+    existing = db.session.query(User.email, User.contact_num).filter(or_(
+        User.email.in_([user.email for user in users]),
+        User.contact_num.in_([user.contact_num for user in users])
+    )).all()
+    emails = {email for email, _ in existing}
+    contact_nums = {contact_num for _, contact_num in existing}
+
+    reasons = {}
+    for user in users:
+        if user.email in emails:
+            reasons[user.id] = "Email already registered"
+        elif user.contact_num in contact_nums:
+            reasons[user.id] = "Contact number already registered"
+        else:
+            reasons[user.id] = "Already registered"
+    return reasons
+
+
+def _import_chunk(chunk):
+    # Hashing dominates: the whole chunk goes through the bcrypt pool at once
+    password_hashes = hash_passwords([password for _, _, password in chunk])
+
+    now = datetime.utcnow()
+    rows = []
+    for (_, user, _), password_hash in zip(chunk, password_hashes):
+        rows.append({
+            'id': user.id, 'name': user.name, 'dob': user.dob, 'city': user.city,
+            'barangay_complainant': user.barangay_complainant, 'contact_num': user.contact_num,
+            'email': user.email, 'is_active': False, 'password_hash': password_hash, 'role': user.role,
+            'id_type': user.id_type, 'id_url': user.id_url, 'created_at': now, 'updated_at': now
+        })
+
+    try:
+        with db.session.begin_nested():
+            # A taken email or contact number skips the row instead of
+            # failing the INSERT; no check-then-insert race either
+            stmt = insert(User.__table__).values(rows).on_conflict_do_nothing().returning(User.__table__.c.id)
+            created = set(db.session.execute(stmt).scalars())
+            for _, user, _ in chunk:
+                if user.id in created:
+                    # Delivered by the mail worker once this commits
+                    user.queue_activation_email()
+            db.session.flush()
+    except Exception as e:
+        return [(row, user, "failed", f"Chunk insert failed: {e.__class__.__name__}") for row, user, _ in chunk]
+
+    skipped = [user for _, user, _ in chunk if user.id not in created]
+    reasons = _duplicate_reasons(skipped) if skipped else {}
+    return [(row, user, "created", None) if user.id in created else (row, user, "duplicate", reasons[user.id])
+            for row, user, _ in chunk]
+
+
+def _result(row, email, result, error=None, user_id=None):
+    entry = {"row": row, "email": email, "result": result}
+    if user_id is not None:
+        entry["id"] = user_id
+    if error is not None:
+        entry["error"] = error
+    return entry
+
+
+def import_users(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Create inactive accounts from ``(row_number, record)`` pairs.
+
+    Yields one result per row, in input order within each chunk: created
+    (with the new id), duplicate, invalid or failed. Every chunk is hashed in
+    parallel, inserted with one statement and committed on its own, together
+    with the activation emails of its new accounts.
+    """
+    chunk = []
+    for row, record in records:
+        try:
+            user, password = _validate(record)
+        except ValueError as e:
+            email = record.get('email') if isinstance(record, dict) else None
+            yield _result(row, email, "invalid", str(e))
+            continue
+
+        chunk.append((row, user, password))
+        if len(chunk) >= chunk_size:
+            yield from _finish_chunk(chunk)
+            chunk = []
+
+    if chunk:
+        yield from _finish_chunk(chunk)
+
+
+def _finish_chunk(chunk):
+    results = _import_chunk(chunk)
+    db.session.commit()
+    for row, user, result, error in results:
+        yield _result(row, user.email, result, error, user.id if result == "created" else None)
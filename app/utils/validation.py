@@ -0,0 +1,24 @@
+from sqlalchemy import String
+
+
+def check_column_values(table, record):
+    """Reject what Postgres would refuse for ``table``'s columns: non-string
+    values in string (and enum) columns, unknown enum values and strings
+    longer than the column.
+
+    Raises ValueError, so a bulk loader reports the row instead of failing the
+    INSERT of its whole chunk. Keys that are not columns are left alone.
+    """
+    for field, value in record.items():
+        if field not in table.c or value is None:
+            continue
+        column_type = table.c[field].type
+        if not isinstance(column_type, String):
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f"The field '{field}' must be a string.")
+        enums = getattr(column_type, 'enums', None)
+        if enums and value not in enums:
+            raise ValueError(f"Invalid value '{value}' for '{field}'.")
+        if column_type.length and len(value) > column_type.length:
+            raise ValueError(f"The field '{field}' must be at most {column_type.length} characters.")
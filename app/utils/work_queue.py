@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from app import db
+from app.models.report import Report
+from app.models.report_stat import ReportStat
+from app.utils.cache import invalidate_on_commit
+from app.utils.report_events import record_report_events, status_changed_event
+
+MAX_CLAIM = 50
+
+
+def _claim(predicate, order_by, agent_id, count, now, lease_expires_at):
+    # Lock up to ``count`` matching rows, skipping any another agent holds
+    # right now, and take them over in the same statement
+    reports = Report.__table__
+    candidates = (
+        select(reports.c.id, reports.c.status.label('old_status'))
+        .where(predicate)
+        .order_by(*order_by)
+        .limit(count)
+        .with_for_update(skip_locked=True)
+        .cte('candidates')
+    )
+    stmt = (
+        update(reports)
+        .where(reports.c.id == candidates.c.id)
+        .values(status='viewed', assignee_id=agent_id, lease_expires_at=lease_expires_at, updated_at=now)
+        .returning(reports.c.id, candidates.c.old_status)
+    )
+    return db.session.execute(stmt).all()
+
+
+def claim_reports(agent_id, count, lease_seconds):
+    """Assign up to ``count`` queued reports to ``agent_id`` and mark them viewed.
+
+    Viewed reports whose lease expired are reclaimed first, then the oldest
+    unopened ones. FOR UPDATE SKIP LOCKED lets any number of agents claim at
+    once: each gets different reports and none waits on another's rows.
+    Returns the claimed report ids, oldest claim first.
+
+    The caller commits, and should do so right away: the status counters
+    updated here are shared by every claim.
+    """
+    reports = Report.__table__
+    now = datetime.utcnow()
+    lease_expires_at = now + timedelta(seconds=lease_seconds)
+
+    claimed = _claim(
+        (reports.c.status == 'viewed') & (reports.c.lease_expires_at < now),
+        (reports.c.lease_expires_at,),
+        agent_id, count, now, lease_expires_at
+    )
+    if len(claimed) < count:
+        claimed += _claim(
+            reports.c.status == 'unopened',
+            (reports.c.created_at, reports.c.id),
+            agent_id, count - len(claimed), now, lease_expires_at
+        )
+
+    opened = sum(1 for _, old_status in claimed if old_status == 'unopened')
+    ReportStat.apply_deltas(db.session.connection(), {('status', 'unopened'): -opened, ('status', 'viewed'): opened})
+    ids = [id for id, _ in claimed]
+    invalidate_on_commit(db.session, 'report', *ids)
+    record_report_events(db.session, [status_changed_event(id, old_status, 'viewed')
+                                      for id, old_status in claimed if old_status == 'unopened'])
+    return ids
+
+
+def _held_claim(report_id, agent_id, now):
+    reports = Report.__table__
+    return (
+        update(reports)
+        .where(
+            reports.c.id == report_id,
+            reports.c.assignee_id == agent_id,
+            reports.c.status == 'viewed',
+            reports.c.lease_expires_at >= now
+        )
+        .returning(reports.c.lease_expires_at)
+    )
+
+
+def renew_claim(report_id, agent_id, lease_seconds):
+    """Extend the agent's lease on a report it still holds. Returns the new
+    expiry, or None when the claim lapsed or belongs to someone else."""
+    now = datetime.utcnow()
+    stmt = _held_claim(report_id, agent_id, now).values(lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=now)
+    lease_expires_at = db.session.execute(stmt).scalar()
+    if lease_expires_at is not None:
+        invalidate_on_commit(db.session, 'report', report_id)
+    return lease_expires_at
+
+
+def release_claim(report_id, agent_id):
+    """Hand a claimed report straight back to the queue. Returns False when the
+    agent does not hold it."""
+    now = datetime.utcnow()
+    stmt = _held_claim(report_id, agent_id, now).values(assignee_id=None, lease_expires_at=now, updated_at=now)
+    released = db.session.execute(stmt).scalar() is not None
+    if released:
+        invalidate_on_commit(db.session, 'report', report_id)
+    return released
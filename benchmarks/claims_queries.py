@@ -0,0 +1,65 @@
+"""Count the SQL statements behind POST /reports/create-report for a token
+that carries identity claims versus a legacy identity-only token.
+
+Runs in-process against the database configured in .env. The request body is
+deliberately incomplete so the route stops at validation and nothing is
+written::
+
+    python benchmarks/claims_queries.py --email someone@example.com
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+
+
+def count_statements(client, token, repeat):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        for _ in range(repeat):
+            client.post('/reports/create-report', json={},
+                        headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--email', required=True, help='An existing user with role "user".')
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        from app.models.user import User
+        from app.utils.auth import create_user_token
+
+        user = User.query.filter_by(email=args.email).first()
+        if user is None:
+            raise SystemExit(f'No user with email {args.email}')
+
+        tokens = {
+            'legacy token': create_access_token(identity=str(user.id)),
+            'claims token': create_user_token(user),
+        }
+        db.session.remove()
+
+        client = app.test_client()
+        for label, token in tokens.items():
+            total = count_statements(client, token, args.repeat)
+            print(f'{label:>13}: {total / args.repeat:.2f} SQL statements per request')
+
+
+if __name__ == '__main__':
+    main()
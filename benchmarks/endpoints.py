@@ -0,0 +1,198 @@
+"""Load-test the main API endpoints and compare the results with a saved baseline.
+
+Needs a running server backed by data from ``flask seed-data``::
+
+    flask seed-data --users 1000 --reports 200000 --seed 1
+    gunicorn -w 4 -b :5555 'app:create_app()'
+    python benchmarks/endpoints.py --concurrency 16 --save baseline.json
+    # ...change things, restart the server...
+    python benchmarks/endpoints.py --concurrency 16 --compare baseline.json
+
+Each scenario runs for --duration seconds on --concurrency threads and
+reports throughput plus p50/p95/p99 latency. The create-report scenario
+writes real rows, filed by the bench user it logs in as. ``flask seed-data
+--reset`` removes them only because it deletes every report of the bench
+accounts; the data is not a clean slate otherwise.
+"""
+import argparse
+import json
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+SEED_EMAIL_DOMAIN = 'seed.invalid'
+INCIDENT_TYPES = ['Physical Abuse', 'Verbal Abuse', 'Sexual Harassment', 'Child Abuse']
+STATUSES = ['unopened', 'viewed', 'pending', 'resolved']
+
+
+def request(method, url, body=None, token=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    req.add_header('Content-Type', 'application/json')
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except urllib.error.URLError:
+        return 0, b''
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def login(base_url, email, password):
+    status, body = request('POST', f'{base_url}/auth/login', {'email': email, 'password': password})
+    if status != 200:
+        raise SystemExit(f'Login as {email} failed ({status}): {body!r}')
+    payload = json.loads(body)
+    return payload['access_token'], payload['user']['id']
+
+
+def scenarios(base_url, password, users, agent_token):
+    """Map scenario name -> zero-argument callable issuing one request."""
+    def do_login():
+        email = f'bench-user{random.randrange(len(users))}@{SEED_EMAIL_DOMAIN}'
+        return request('POST', f'{base_url}/auth/login', {'email': email, 'password': password})
+
+    def do_create_report():
+        token, _ = random.choice(users)
+        return request('POST', f'{base_url}/reports/create-report', {
+            'city': 'Quezon City',
+            'description': 'Benchmark report',
+            'incident_brgy': f'Brgy {random.randint(1, 40)}',
+            'reporter_type': random.choice(['victim', 'witness']),
+            'incident_type': random.choice(INCIDENT_TYPES),
+            'location': 'Benchmark St.',
+        }, token)
+
+    def do_list_reports():
+        # Half the dashboard loads are filtered by status
+        query = '?limit=50' + (f'&status={random.choice(STATUSES)}' if random.random() < 0.5 else '')
+        return request('GET', f'{base_url}/reports/{query}', token=agent_token)
+
+    def do_get_user():
+        _, user_id = random.choice(users)
+        return request('GET', f'{base_url}/users/{user_id}', token=agent_token)
+
+    return {
+        'login': do_login,
+        'create_report': do_create_report,
+        'list_reports': do_list_reports,
+        'get_user': do_get_user,
+    }
+
+
+def run_scenario(call, concurrency, duration):
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, _ = call()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if not 200 <= status < 400:
+                errors.append(status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print per-scenario deltas; return the scenarios whose p95 regressed
+    by more than ``tolerance`` percent."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            before, after = previous[key], current[key]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f'{name:>14} {key:>15}: {before:9.2f} -> {after:9.2f} ({change:+.1f}%)')
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance / 100):
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:5555')
+    parser.add_argument('--password', default='Bench123!', help='Password given to flask seed-data.')
+    parser.add_argument('--users', type=int, default=50, help='Seeded users to log in and rotate through.')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds per scenario.')
+    parser.add_argument('--scenarios', default='login,create_report,list_reports,get_user')
+    parser.add_argument('--save', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against.')
+    parser.add_argument('--tolerance', type=float, default=10.0,
+                        help='Allowed p95 regression in percent before --compare fails.')
+    args = parser.parse_args()
+
+    agent_token, _ = login(args.base_url, f'bench-agent0@{SEED_EMAIL_DOMAIN}', args.password)
+    users = [login(args.base_url, f'bench-user{i}@{SEED_EMAIL_DOMAIN}', args.password) for i in range(args.users)]
+    available = scenarios(args.base_url, args.password, users, agent_token)
+
+    results = {}
+    for name in args.scenarios.split(','):
+        if name not in available:
+            raise SystemExit(f'Unknown scenario {name!r}; choose from {", ".join(available)}.')
+        results[name] = run_scenario(available[name], args.concurrency, args.duration)
+        r = results[name]
+        print(f'{name:>14}: n={r["requests"]:<7} err={r["errors"]:<5} {r["throughput_rps"]:8.1f} req/s '
+              f'p50={r["p50_ms"]:7.2f}ms p95={r["p95_ms"]:7.2f}ms p99={r["p99_ms"]:7.2f}ms')
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'revision': git_revision(),
+                'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+                'concurrency': args.concurrency,
+                'duration': args.duration,
+                'results': results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(f'p95 regressed by more than {args.tolerance:g}% in: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Measure GET /reports/<id> latency with and without a concurrent login storm.
+
+Run against a live server (e.g. gunicorn with a few workers)::
+
+    python benchmarks/login_storm.py --base-url http://localhost:5555 \\
+        --email agent@example.com --password 'Secret123!' --report-id 1
+
+With bcrypt on the request thread the p99 of the cheap endpoint climbs with
+the number of login threads; with the hashing pool it should stay flat and
+excess logins come back as 429.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def request(method, url, body=None, token=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    req.add_header('Content-Type', 'application/json')
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def probe(url, token, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        request('GET', url, token=token)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def storm(url, credentials, stop, statuses):
+    while not stop.is_set():
+        status, _ = request('POST', url, credentials)
+        statuses.append(status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:5555')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--report-id', type=int, default=1)
+    parser.add_argument('--login-threads', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15.0)
+    args = parser.parse_args()
+
+    credentials = {'email': args.email, 'password': args.password}
+    status, body = request('POST', f'{args.base_url}/auth/login', credentials)
+    if status != 200:
+        raise SystemExit(f'Login failed ({status}): {body!r}')
+    token = json.loads(body)['access_token']
+    probe_url = f'{args.base_url}/reports/{args.report_id}'
+
+    baseline = probe(probe_url, token, args.duration)
+
+    stop = threading.Event()
+    statuses = []
+    threads = [threading.Thread(target=storm, args=(f'{args.base_url}/auth/login', credentials, stop, statuses))
+               for _ in range(args.login_threads)]
+    for thread in threads:
+        thread.start()
+    try:
+        under_storm = probe(probe_url, token, args.duration)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    for label, samples in (('idle', baseline), ('login storm', under_storm)):
+        print(f'{label:>12}: n={len(samples):<6} p50={statistics.median(samples):7.2f}ms '
+              f'p99={percentile(samples, 99):7.2f}ms')
+    print(f'{"logins":>12}: n={len(statuses):<6} ok={statuses.count(200)} shed(429)={statuses.count(429)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark report full-text search against the ILIKE scan it replaces.
+
+Seeds a synthetic corpus into the database configured in .env (inside a
+transaction that is rolled back unless --keep is given), then times the
+first page of GET /reports/search for a handful of queries::
+
+    python benchmarks/search.py --reports 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import text
+from app import create_app, db
+
+WORDS = [
+    'sinuntok', 'sinampal', 'pinagmumura', 'sinigawan', 'hinipuan', 'pinagbantaan', 'tinulak',
+    'punched', 'slapped', 'threatened', 'shouted', 'groped', 'kicked', 'choked', 'followed',
+    'asawa', 'kapitbahay', 'tiyuhin', 'boyfriend', 'husband', 'neighbor', 'stepfather', 'employer',
+    'bahay', 'kalsada', 'palengke', 'eskwelahan', 'jeep', 'tricycle', 'house', 'market', 'school',
+    'gabi', 'umaga', 'night', 'morning', 'lasing', 'drunk', 'pera', 'money', 'anak', 'child',
+    'paulit-ulit', 'repeatedly', 'injured', 'bruises', 'pasa', 'dugo', 'hospital', 'barangay',
+]
+
+SEED_CORPUS_SQL = text("""
+    WITH seed_users AS (
+        SELECT array_agg(id) AS ids FROM users WHERE email LIKE '%@' || :domain
+    ), words AS (
+        SELECT CAST(:words AS text[]) AS w
+    )
+    INSERT INTO reports (reporter_name, reporter_id, city, description, complainant_brgy,
+                         incident_brgy, reporter_type, incident_type, location, status,
+                         created_at, updated_at, evidences)
+    SELECT 'Seed User', seed_users.ids[1 + g % array_length(seed_users.ids, 1)],
+           'City ' || (g % 20),
+           (SELECT string_agg(words.w[1 + floor(random() * array_length(words.w, 1))::int], ' ')
+            FROM generate_series(1, 25 + g % 20) WHERE g > 0),
+           'Brgy ' || (g % 50), 'Brgy ' || (g % 80),
+           (ARRAY['victim', 'witness'])[1 + g % 2]::reporter_types,
+           (ARRAY['Physical Abuse', 'Verbal Abuse', 'Sexual Harassment', 'Child Abuse'])[1 + g % 4]::incident_types,
+           words.w[1 + g % array_length(words.w, 1)] || ' ' || g,
+           (ARRAY['unopened', 'viewed', 'pending', 'resolved'])[1 + g % 4]::report_status,
+           now() - (g || ' minutes')::interval, now(), '[]'::jsonb
+    FROM generate_series(1, :reports) AS g, seed_users, words
+""")
+
+QUERIES = ['sinuntok', 'drunk husband', '"stepfather" bruises', 'palengke -gabi', 'choked OR kicked']
+
+
+def timed(connection, statement, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(statement).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def p95(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help='Commit the synthetic corpus instead of rolling back.')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        from app.models.report import Report
+        from app.utils.pagination import keyset_query
+        from app.utils.query_plans import SEED_USERS_SQL, SEED_EMAIL_DOMAIN
+
+        with db.engine.connect() as connection:
+            transaction = connection.begin()
+            try:
+                start = time.perf_counter()
+                connection.execute(SEED_USERS_SQL, {'users': args.users, 'domain': SEED_EMAIL_DOMAIN})
+                connection.execute(SEED_CORPUS_SQL, {'reports': args.reports, 'words': WORDS,
+                                                     'domain': SEED_EMAIL_DOMAIN})
+                connection.execute(text('ANALYZE reports'))
+                print(f'Seeded {args.reports} reports in {time.perf_counter() - start:.1f}s\n')
+
+                print(f'{"query":<24} {"fts p50":>9} {"fts p95":>9} {"ilike p50":>10} {"ilike p95":>10}')
+                for terms in QUERIES:
+                    search, rank = Report.search_query(db.session.query(Report), terms)
+                    search = keyset_query(search.add_columns(rank.label('rank')), (rank, Report.id))
+                    fts = timed(connection, search.statement, args.repeat)
+
+                    word = terms.split()[0].strip('"')
+                    pattern = f'%{word}%'
+                    ilike = keyset_query(
+                        Report.query.filter(db.or_(Report.description.ilike(pattern), Report.location.ilike(pattern))),
+                        (Report.created_at, Report.id)
+                    )
+                    scans = timed(connection, ilike.statement, max(1, args.repeat // 4))
+
+                    print(f'{terms:<24} {statistics.median(fts):8.2f}ms {p95(fts):8.2f}ms '
+                          f'{statistics.median(scans):9.2f}ms {p95(scans):9.2f}ms')
+            finally:
+                if args.keep:
+                    transaction.commit()
+                    print('\nCorpus kept; run `flask reports rebuild-stats` to refresh report_stats.')
+                else:
+                    transaction.rollback()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Compare requests/sec per worker of the sync (WSGI) and async (ASGI) modes.
+
+Start both servers on the same seeded database with the same number of
+workers and the same simulated DB latency, then point this script at them::
+
+    export DB_SIMULATED_LATENCY_MS=20
+    gunicorn -c gunicorn.conf.py -w 2 --threads 4 -b :5555 run:flask_app
+    uvicorn app.asgi:application --workers 2 --port 5556
+    python benchmarks/serving_modes.py --workers 2 --concurrency 64
+
+Every request then spends at least that long waiting on Postgres. A sync
+worker holds a thread for the wait; an async worker serves other requests
+on the same event loop.
+"""
+import argparse
+import random
+
+from endpoints import SEED_EMAIL_DOMAIN, STATUSES, login, request, run_scenario
+
+
+def read_scenarios(base_url, agent_token, user_ids):
+    return {
+        'list_reports': lambda: request(
+            'GET', f'{base_url}/reports/?limit=20&status={random.choice(STATUSES)}', token=agent_token),
+        'get_user': lambda: request(
+            'GET', f'{base_url}/users/{random.choice(user_ids)}', token=agent_token),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sync-url', default='http://localhost:5555')
+    parser.add_argument('--async-url', default='http://localhost:5556')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes per server.')
+    parser.add_argument('--password', default='Bench123!', help='Password given to flask seed-data.')
+    parser.add_argument('--users', type=int, default=20, help='Seeded users to look up.')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds per scenario and mode.')
+    args = parser.parse_args()
+
+    # Tokens are stateless, so one login serves both servers
+    agent_token, _ = login(args.sync_url, f'bench-agent0@{SEED_EMAIL_DOMAIN}', args.password)
+    user_ids = [login(args.sync_url, f'bench-user{i}@{SEED_EMAIL_DOMAIN}', args.password)[1]
+                for i in range(args.users)]
+
+    for mode, base_url in (('sync', args.sync_url), ('async', args.async_url)):
+        for name, call in read_scenarios(base_url, agent_token, user_ids).items():
+            r = run_scenario(call, args.concurrency, args.duration)
+            print(f'{mode:>5} {name:>12}: {r["throughput_rps"] / args.workers:8.1f} req/s/worker '
+                  f'p50={r["p50_ms"]:7.2f}ms p99={r["p99_ms"]:7.2f}ms err={r["errors"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""Gunicorn settings for pre-fork serving::
+
+    gunicorn -c gunicorn.conf.py run:flask_app
+
+The app is built once in the master (preload_app) and forked into workers;
+each worker drops the inherited connection pools and opens its own.
+
+Workers are threaded: a request waiting on the bcrypt pool or the database
+leaves the worker's other threads free to serve, and the hashing pool's 429
+shedding (BCRYPT_MAX_PENDING) only has concurrency to act on with threads.
+An open GET /reports/stream holds one thread for as long as it stays
+connected: raise GUNICORN_THREADS with the number of dashboards, or serve
+streams through app.asgi.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5555')
+workers = int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1))
+# Read by create_app to split the cores between the workers' bcrypt pools
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+preload_app = True
+
+
+def post_worker_init(worker):
+    from app import db
+    from app.utils.prefork import warm_engines
+
+    warm_engines(worker.wsgi, db)
+    worker.log.info('Worker %s ready', worker.pid)
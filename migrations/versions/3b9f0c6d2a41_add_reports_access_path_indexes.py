@@ -0,0 +1,41 @@
+"""add reports access path indexes
+
+Revision ID: 3b9f0c6d2a41
+Revises: e7d5ceb43b7b
+Create Date: 2026-10-18 09:12:40.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9f0c6d2a41'
+down_revision = 'e7d5ceb43b7b'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_reports_created_at_id', ['created_at', 'id']),
+    ('ix_reports_status_created_at_id', ['status', 'created_at', 'id']),
+    ('ix_reports_incident_brgy_created_at_id', ['incident_brgy', 'created_at', 'id']),
+    ('ix_reports_incident_type_created_at_id', ['incident_type', 'created_at', 'id']),
+    ('ix_reports_reporter_id_created_at', ['reporter_id', 'created_at']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY keeps the reports table writable while the indexes build,
+    # but it cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'reports', columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='reports',
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,27 @@
+"""drop users token_version
+
+Revision ID: 4f6b2e9d1a37
+Revises: 7d1c5e83a4b2
+Create Date: 2026-10-18 21:05:37.402815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f6b2e9d1a37'
+down_revision = '7d1c5e83a4b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tokens are invalidated through token_revocations; the version was never checked
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
@@ -0,0 +1,75 @@
+"""add reports search vector
+
+Revision ID: a91f3e57c0b8
+Revises: 5e0d8b2f6a17
+Create Date: 2026-10-18 13:55:48.630152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a91f3e57c0b8'
+down_revision = '5e0d8b2f6a17'
+branch_labels = None
+depends_on = None
+
+
+# Rows backfilled per transaction, so no single statement holds row locks for long
+BACKFILL_BATCH = 5000
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce({row}location, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({row}description, '')), 'B')"
+)
+
+
+def upgrade():
+    # A generated column would rewrite the whole table under an ACCESS
+    # EXCLUSIVE lock. A plain nullable column is a catalog-only change; a
+    # trigger fills it for new writes and the existing rows are backfilled
+    # in small batches while the table stays writable.
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    op.execute(f"""
+        CREATE FUNCTION reports_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER reports_search_vector_update
+        BEFORE INSERT OR UPDATE OF location, description ON reports
+        FOR EACH ROW EXECUTE FUNCTION reports_search_vector_update()
+    """)
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_id = connection.execute(sa.text('SELECT max(id) FROM reports')).scalar() or 0
+        for start in range(0, max_id, BACKFILL_BATCH):
+            connection.execute(sa.text(
+                f"UPDATE reports SET search_vector = {SEARCH_VECTOR_SQL.format(row='')} "
+                "WHERE id > :start AND id <= :end AND search_vector IS NULL"
+            ), {'start': start, 'end': start + BACKFILL_BATCH})
+
+        op.create_index('ix_reports_search_vector', 'reports', ['search_vector'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reports_search_vector', table_name='reports',
+                      postgresql_concurrently=True, if_exists=True)
+
+    op.execute('DROP TRIGGER reports_search_vector_update ON reports')
+    op.execute('DROP FUNCTION reports_search_vector_update()')
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.drop_column('search_vector')
+
+    # ### end Alembic commands ###
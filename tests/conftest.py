@@ -0,0 +1,112 @@
+"""Shared fixtures.
+
+Tests that need a database run against the Postgres in ``TEST_DATABASE_URI``
+(migrated to head once per session, emptied after every test) and are
+skipped when it is not set. Never point it at a database you care about.
+"""
+import os
+
+TEST_DATABASE_URI = os.getenv('TEST_DATABASE_URI')
+
+os.environ['DATABASE_URI'] = TEST_DATABASE_URI or 'sqlite://'
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-of-at-least-32-bytes')
+os.environ.setdefault('MAIL_PORT', '25')
+# Hash inline with the cheapest cost; the pools have their own tests
+os.environ['BCRYPT_POOL_SIZE'] = '0'
+os.environ['BCRYPT_BATCH_POOL_SIZE'] = '0'
+os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+os.environ['ENTITY_CACHE_BACKEND'] = 'null'
+# Any endpoint a test hits fails it when it goes over its @query_budget
+os.environ['QUERY_BUDGET_MODE'] = 'raise'
+
+import uuid
+from contextlib import contextmanager
+from datetime import date
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.utils.query_budget import QueryBudgetExceeded, count_queries
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, MAIL_SUPPRESS_SEND=True)
+    return app
+
+
+@pytest.fixture(scope='session')
+def _migrated(app):
+    if TEST_DATABASE_URI is None:
+        pytest.skip('TEST_DATABASE_URI is not set')
+    from flask_migrate import Migrate, upgrade
+
+    Migrate(app, db, directory=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations'))
+    with app.app_context():
+        upgrade()
+
+
+@pytest.fixture
+def database(app, _migrated):
+    with app.app_context():
+        yield db
+        db.session.remove()
+        tables = ', '.join(table.name for table in db.metadata.sorted_tables)
+        with db.engine.begin() as connection:
+            connection.execute(text(f'TRUNCATE {tables} RESTART IDENTITY CASCADE'))
+        app.extensions['entity_cache'].clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(database):
+    from app.models.user import User
+    from app.utils.hashing import hash_password
+
+    count = 0
+
+    def make_user(role='user', password='Password1!', **fields):
+        nonlocal count
+        count += 1
+        user = User(
+            id=uuid.uuid4(), name=f'Test User {count}', dob=date(1990, 1, 1), city='Manila',
+            barangay_complainant='Brgy 1', contact_num=f'0917{count:07d}', email=f'user{count}@example.com',
+            is_active=True, role=role, id_type='image', id_url='https://example.com/id.png', **fields
+        )
+        user.password_hash = hash_password(password)
+        database.session.add(user)
+        database.session.commit()
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def auth_headers(app):
+    from app.utils.auth import create_user_token
+
+    def auth_headers(user):
+        with app.app_context():
+            return {'Authorization': f'Bearer {create_user_token(user)}'}
+
+    return auth_headers
+
+
+@pytest.fixture
+def max_queries(database):
+    """``with max_queries(n): ...`` fails the test when the block runs more
+    than ``n`` SQL statements, for code that is not a budgeted view."""
+    @contextmanager
+    def max_queries(limit):
+        with count_queries(database.engine) as statements:
+            yield statements
+        if len(statements) > limit:
+            listing = '\n'.join(f'  {statement[:500]}' for statement in statements)
+            raise QueryBudgetExceeded(f'{len(statements)} SQL statements, budget is {limit}\n{listing}')
+
+    return max_queries
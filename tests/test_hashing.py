@@ -0,0 +1,95 @@
+import os
+import threading
+import bcrypt
+import pytest
+from flask import request
+from app import create_app
+from app.utils import hashing
+
+
+@pytest.fixture
+def hashing_app(monkeypatch):
+    app = create_app()
+    app.config.update(TESTING=True, BCRYPT_POOL_SIZE=0, BCRYPT_MAX_PENDING=2, BCRYPT_RETRY_AFTER=3)
+
+    @app.post('/_test/hash')
+    def hash_route():
+        return {"hash": hashing.hash_password(request.json['password'])}
+
+    # Each hash blocks until released, so requests pile up as in a login storm
+    started = threading.Semaphore(0)
+    release = threading.Event()
+
+    def slow_hashpw(password, rounds):
+        started.release()
+        release.wait(10)
+        return 'hashed'
+
+    monkeypatch.setattr(hashing, '_hashpw', slow_hashpw)
+    hashing.pool.shutdown()
+    yield app, started, release
+    release.set()
+    hashing.pool.shutdown()
+
+
+def test_hashes_beyond_max_pending_are_shed_with_429(hashing_app):
+    app, started, release = hashing_app
+    statuses = []
+
+    def post():
+        statuses.append(app.test_client().post('/_test/hash', json={'password': 'x'}).status_code)
+
+    # Two request threads take every slot...
+    threads = [threading.Thread(target=post) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        assert started.acquire(timeout=5)
+
+    # ...so the next one is turned away at once instead of queueing
+    response = app.test_client().post('/_test/hash', json={'password': 'x'})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3'
+    assert response.get_json() == {"error": hashing.HashingOverloaded.description}
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert statuses == [200, 200]
+
+    # The slots are returned once the hashes finish
+    assert app.test_client().post('/_test/hash', json={'password': 'x'}).status_code == 200
+
+
+@pytest.fixture
+def four_cores(monkeypatch):
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+    for name in ('WEB_CONCURRENCY', 'BCRYPT_POOL_SIZE', 'BCRYPT_BATCH_POOL_SIZE'):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def test_pool_sizes_split_cores_only_between_server_workers(four_cores):
+    # The CLI (no server): every core hashes
+    app = create_app()
+    assert app.config['BCRYPT_POOL_SIZE'] == 4
+    assert app.config['BCRYPT_BATCH_POOL_SIZE'] == 4
+
+    four_cores.setenv('WEB_CONCURRENCY', '2')
+    app = create_app()
+    assert app.config['BCRYPT_POOL_SIZE'] == 2
+    assert app.config['BCRYPT_BATCH_POOL_SIZE'] == 4
+
+
+def test_batch_hashing_runs_on_several_processes(four_cores):
+    app = create_app()
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    hashing.batch_pool.shutdown()
+    try:
+        with app.app_context():
+            hashes = hashing.hash_passwords(['Password1!', 'Password2!'])
+            assert hashing.batch_pool._executor._max_workers == 4
+        assert bcrypt.checkpw(b'Password1!', hashes[0].encode('utf-8'))
+        assert bcrypt.checkpw(b'Password2!', hashes[1].encode('utf-8'))
+    finally:
+        hashing.batch_pool.shutdown()
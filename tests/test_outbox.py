@@ -0,0 +1,112 @@
+import socket
+from datetime import datetime
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import text
+from app import mail
+from app.models.outbox import OutboxEmail
+from app.utils.outbox import drain_outbox
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class SinkHandler:
+    """Collects delivered messages and, for each one, checks that the
+    worker holds no lock on the outbox rows while it is sending."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.messages = []
+        self.rows_locked = []
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.engine.connect() as connection:
+            try:
+                connection.execute(text('SELECT id FROM email_outbox FOR UPDATE NOWAIT'))
+                self.rows_locked.append(False)
+            except Exception:
+                self.rows_locked.append(True)
+            connection.rollback()
+        self.messages.append(envelope)
+        return '250 OK'
+
+
+@pytest.fixture
+def use_smtp(app):
+    original = dict(app.config)
+
+    def use_smtp(port):
+        app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=port, MAIL_USE_TLS=False, MAIL_USE_SSL=False,
+                          MAIL_USERNAME=None, MAIL_PASSWORD=None, MAIL_SUPPRESS_SEND=False, MAIL_DEBUG=False)
+        mail.init_app(app)
+
+    yield use_smtp
+    app.config.clear()
+    app.config.update(original)
+    mail.init_app(app)
+
+
+@pytest.fixture
+def smtp_sink(database, use_smtp):
+    handler = SinkHandler(database.engine)
+    controller = Controller(handler, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    use_smtp(controller.port)
+    yield handler
+    controller.stop()
+
+
+def _queue(database, count):
+    for i in range(count):
+        OutboxEmail.enqueue(f'Subject {i}', [f'person{i}@example.com'], f'Body {i}')
+    database.session.commit()
+
+
+def test_drain_delivers_due_emails(database, smtp_sink):
+    _queue(database, 3)
+
+    assert drain_outbox() == 3
+
+    assert sorted(envelope.rcpt_tos[0] for envelope in smtp_sink.messages) == [
+        'person0@example.com', 'person1@example.com', 'person2@example.com'
+    ]
+    emails = OutboxEmail.query.all()
+    assert {email.status for email in emails} == {'sent'}
+    assert {email.attempts for email in emails} == {1}
+    assert drain_outbox() == 0
+
+
+def test_rows_are_not_locked_while_sending(database, smtp_sink):
+    _queue(database, 2)
+
+    drain_outbox()
+
+    assert smtp_sink.rows_locked == [False, False]
+
+
+def test_unreachable_server_schedules_a_retry(database, use_smtp):
+    use_smtp(_free_port())
+    _queue(database, 1)
+
+    assert drain_outbox() == 0
+
+    email = OutboxEmail.query.one()
+    assert email.status == 'pending'
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > datetime.utcnow()
+    # Not due again until the backoff runs out
+    assert drain_outbox() == 0
+
+
+def test_last_attempt_dead_letters_the_email(database, use_smtp):
+    use_smtp(_free_port())
+    _queue(database, 1)
+
+    drain_outbox(max_attempts=1)
+
+    assert OutboxEmail.query.one().status == 'dead'
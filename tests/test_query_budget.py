@@ -0,0 +1,123 @@
+import logging
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.models.report import Report
+from app.utils.ingest import ingest_reports
+from app.utils.query_budget import QueryBudgetExceeded, query_budget
+
+REPORTS = 30
+
+
+@pytest.fixture
+def budget_app():
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    @app.get('/_test/queries/<int:count>')
+    @query_budget(1)
+    def run_queries(count):
+        for _ in range(count):
+            db.session.execute(text('SELECT 1'))
+        return {"ran": count}
+
+    return app
+
+
+def test_raise_mode_fails_the_request_over_budget(budget_app):
+    budget_app.config['QUERY_BUDGET_MODE'] = 'raise'
+    client = budget_app.test_client()
+
+    assert client.get('/_test/queries/1').status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match='issued 3 SQL statements, budget is 1'):
+        client.get('/_test/queries/3')
+
+
+def test_log_mode_only_warns(budget_app, caplog):
+    budget_app.config['QUERY_BUDGET_MODE'] = 'log'
+
+    with caplog.at_level(logging.WARNING, logger='app.utils.query_budget'):
+        assert budget_app.test_client().get('/_test/queries/3').status_code == 200
+    assert 'budget is 1' in caplog.text
+
+
+def test_off_mode_skips_the_check(budget_app):
+    budget_app.config['QUERY_BUDGET_MODE'] = 'off'
+    assert budget_app.test_client().get('/_test/queries/3').status_code == 200
+
+
+# The endpoints below run in 'raise' mode (see conftest): a view that issues
+# a query per row fails with QueryBudgetExceeded instead of passing slowly.
+
+def _report_fields(reporter, **fields):
+    return {
+        'reporter_name': reporter.name, 'reporter_id': reporter.id, 'city': 'Manila',
+        'description': 'Incident description', 'complainant_brgy': 'Brgy 1', 'incident_brgy': 'Brgy 2',
+        'reporter_type': 'victim', 'incident_type': 'Physical Abuse', 'location': 'Somewhere',
+        'evidences': [], **fields
+    }
+
+
+@pytest.fixture
+def reports(database, make_user):
+    reporter = make_user()
+    reports = [Report(**_report_fields(reporter)) for _ in range(REPORTS)]
+    database.session.add_all(reports)
+    database.session.commit()
+    return reporter, [report.id for report in reports]
+
+
+@pytest.fixture
+def agent(make_user):
+    return make_user(role='agent')
+
+
+def test_report_reads_stay_within_budget(client, reports, agent, auth_headers):
+    _, ids = reports
+    headers = auth_headers(agent)
+
+    response = client.get('/reports/?limit=50', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['reports']) == REPORTS
+    assert client.get(f'/reports/{ids[0]}', headers=headers).status_code == 200
+    assert client.get('/reports/stats', headers=headers).status_code == 200
+
+
+def test_user_reads_stay_within_budget(client, reports, agent, auth_headers):
+    reporter, _ = reports
+    headers = auth_headers(agent)
+
+    assert client.get('/users/', headers=headers).status_code == 200
+    assert client.get(f'/users/{reporter.id}', headers=headers).status_code == 200
+
+
+def test_report_writes_stay_within_budget(client, reports, agent, auth_headers):
+    reporter, ids = reports
+    body = {key: value for key, value in _report_fields(reporter).items()
+            if key not in ('reporter_name', 'reporter_id', 'complainant_brgy')}
+
+    assert client.post('/reports/create-report', json=body, headers=auth_headers(reporter)).status_code == 201
+
+    headers = auth_headers(agent)
+    assert client.patch(f'/reports/{ids[0]}', json={'status': 'viewed'}, headers=headers).status_code == 200
+    response = client.post('/reports/transitions', json={'ids': ids[1:], 'status': 'viewed'}, headers=headers)
+    assert response.status_code == 200
+    assert client.post('/reports/claim', json={'count': 1}, headers=headers).status_code == 200
+
+
+def test_login_stays_within_budget(client, make_user):
+    user = make_user(password='Password1!')
+
+    response = client.post('/auth/login', json={'email': user.email, 'password': 'Password1!'})
+    assert response.status_code == 200
+
+
+def test_ingest_cost_does_not_grow_with_rows(database, make_user, max_queries):
+    reporter = make_user()
+    records = [(row, _report_fields(reporter, reporter_id=str(reporter.id)))
+               for row in range(1, 201)]
+
+    # One chunk: reporter lookup, savepoint, insert, stats upsert, event lock, events, release
+    with max_queries(8):
+        result = ingest_reports(records)
+    assert result['inserted'] == 200
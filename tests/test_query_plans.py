@@ -0,0 +1,41 @@
+import pytest
+from app import db
+from app.utils.query_plans import HOT_QUERIES, seed_synthetic_data, explain, find_seq_scans
+
+# Enough rows that the planner prefers the indexes, few enough to seed quickly
+SEED_USERS = 2000
+SEED_REPORTS = 200000
+
+
+@pytest.fixture(scope='module')
+def seeded_connection(app, _migrated):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            transaction = connection.begin()
+            try:
+                seed_synthetic_data(connection, SEED_USERS, SEED_REPORTS)
+                yield connection
+            finally:
+                transaction.rollback()
+
+
+@pytest.mark.parametrize('name', list(HOT_QUERIES))
+def test_hot_query_avoids_seq_scan(app, seeded_connection, name):
+    with app.app_context():
+        plan = explain(seeded_connection, HOT_QUERIES[name]())
+    assert find_seq_scans(plan) == [], f'{name} fell back to a sequential scan: {plan}'
+
+
+def test_find_seq_scans_walks_the_plan_tree():
+    plan = {
+        'Node Type': 'Limit',
+        'Plans': [{
+            'Node Type': 'Nested Loop',
+            'Plans': [
+                {'Node Type': 'Index Scan', 'Relation Name': 'reports'},
+                {'Node Type': 'Seq Scan', 'Relation Name': 'users'},
+                {'Node Type': 'Seq Scan', 'Relation Name': 'report_stats'}
+            ]
+        }]
+    }
+    assert find_seq_scans(plan) == ['users']
@@ -0,0 +1,36 @@
+import os
+import pytest
+from app import create_app, db
+from app.models.report import Report
+from app.utils.replicas import READ_YOUR_WRITES_COOKIE
+
+
+@pytest.fixture
+def replica_app(monkeypatch, database):
+    # The test database doubles as the replica: only the routing is under test
+    monkeypatch.setenv('DATABASE_REPLICA_URIS', os.environ['DATABASE_URI'])
+    app = create_app()
+    app.config.update(TESTING=True)
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_bulk_transition_keeps_the_writer_on_the_primary(replica_app, database, make_user, auth_headers):
+    reporter = make_user()
+    report = Report(
+        reporter_name=reporter.name, reporter_id=reporter.id, city='Manila', description='Incident description',
+        complainant_brgy='Brgy 1', incident_brgy='Brgy 2', reporter_type='victim', incident_type='Physical Abuse',
+        location='Somewhere', evidences=[]
+    )
+    database.session.add(report)
+    database.session.commit()
+
+    # A Core UPDATE, no flush: the write must still be noticed
+    response = replica_app.test_client().post(
+        '/reports/transitions', json={'ids': [report.id], 'status': 'viewed'}, headers=auth_headers(make_user(role='agent'))
+    )
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 1
+    assert READ_YOUR_WRITES_COOKIE in response.headers.get('Set-Cookie', '')